@@ -1,104 +1,435 @@
+import math
+import threading
+import time
+from types import SimpleNamespace
 import cv2
 import mediapipe as mp
 import numpy as np
 
+class Lm:
+    """MediaPipe hand landmark indices into the (21, 2) 'px' array"""
+    WRIST = 0
+    THUMB_TIP = 4
+    INDEX_MCP = 5
+    INDEX_PIP = 6
+    INDEX_TIP = 8
+    PALM = 9  # Middle finger MCP (palm center)
+    MIDDLE_MCP = 9
+    MIDDLE_PIP = 10
+    MIDDLE_TIP = 12
+    RING_TIP = 16
+    PINKY_TIP = 20
+
+# Landmark indices of each finger's tip and base joint (thumb, index, middle, ring, pinky)
+FINGER_NAMES = ('thumb', 'index', 'middle', 'ring', 'pinky')
+FINGER_INDEX = {name: i for i, name in enumerate(FINGER_NAMES)}
+FINGER_TIP_IDX = np.array([4, 8, 12, 16, 20])
+FINGER_BASE_IDX = np.array([2, 5, 9, 13, 17])
+# Bit weight of each finger in a finger mask (thumb<<4 | index<<3 | ... | pinky)
+FINGER_BITS = np.array([16, 8, 4, 2, 1])
+# Joints of each finger, base to tip (slicing 'px' with these gives a view)
+FINGER_SLICES = {
+    'thumb': slice(2, 5),
+    'index': slice(5, 9),
+    'middle': slice(9, 13),
+    'ring': slice(13, 17),
+    'pinky': slice(17, 21)
+}
+
+# Skeleton bones as (start, end) landmark index pairs, and each joint as a
+# zero-length segment (round line caps turn those into filled dots)
+HAND_CONNECTIONS = np.array(sorted(mp.solutions.hands.HAND_CONNECTIONS), dtype=np.intp)
+JOINT_SEGMENTS = np.repeat(np.arange(21), 2).reshape(21, 2)
+
+# A frame counts as unchanged when no pixel of its 32x32 thumbnail differs
+# from the last inferred frame's by more than this (sensor noise averages out
+# at that size, a moving hand doesn't); results are reused at most this many
+# frames in a row
+STATIC_FRAME_THRESHOLD = 6
+STATIC_FRAME_MAX_AGE = 15
+
+# Adaptive inference size: fractions of the configured inference_scale to
+# step through when detection can't keep up with the target frame rate.
+# A step down needs the smoothed inference time over 1.3x the frame budget
+# for ADAPTIVE_SLOW_FRAMES frames; a step back up needs it under 0.6x the
+# budget for ADAPTIVE_RECOVER_SECONDS
+ADAPTIVE_SCALE_STEPS = (1.0, 0.75, 0.5)
+ADAPTIVE_SLOW_FRAMES = 30
+ADAPTIVE_RECOVER_SECONDS = 5.0
+
+def configure_camera(cap, width=640, height=480, fps=30):
+    """Request compressed MJPEG capture at a modest size with a one-frame driver queue"""
+    # MJPEG needs far less USB bandwidth than raw YUYV at the same size, and
+    # BUFFERSIZE=1 keeps the driver from queueing stale frames. Cameras that
+    # don't support a setting simply ignore it.
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, fps)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+class CameraStream:
+    """Webcam read on a background thread that keeps only the latest frame"""
+    
+    def __init__(self):
+        self.cap = None
+        self._capture_thread = None
+        self._capturing = False
+        self._latest_frame = None
+        self._frame_ready = threading.Condition()
+        # Consumer pacing, used to skip decoding frames nobody will read
+        self._frame_interval = 0.0
+        self._request_period = 0.0
+        self._last_request = None
+        self._next_request = 0.0
+        self._waiting = False  # A reader is blocked waiting for a frame
+        self._flip_buf = None  # Reused mirrored frame
+    
+    def start(self, camera_index=0):
+        """Open the webcam and start the capture thread"""
+        self.cap = cv2.VideoCapture(camera_index)
+        if not self.cap.isOpened():
+            return False
+        configure_camera(self.cap)
+        self._capturing = True
+        self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._capture_thread.start()
+        return True
+    
+    def _capture_loop(self):
+        """Grab camera frames continuously so capture overlaps inference"""
+        last_grab = time.monotonic()
+        while self._capturing:
+            ret = self.cap.grab()
+            now = time.monotonic()
+            self._frame_interval = 0.8 * self._frame_interval + 0.2 * (now - last_grab)
+            last_grab = now
+            # Only decode frames the consumer can still pick up: if the next
+            # frame arrives before the consumer is due back, this one would be
+            # replaced unseen. Never skip while a reader is already waiting.
+            with self._frame_ready:
+                skip = (ret and not self._waiting
+                        and now + self._frame_interval < self._next_request)
+            if skip:
+                continue
+            frame = None
+            if ret:
+                ret, frame = self.cap.retrieve()
+            with self._frame_ready:
+                if not ret:
+                    self._capturing = False
+                else:
+                    self._latest_frame = frame  # Drop any stale, unconsumed frame
+                self._frame_ready.notify()
+    
+    def read(self):
+        """Get the latest mirrored frame (the buffer is reused on the next call)"""
+        if self.cap is None:
+            return None
+        now = time.monotonic()
+        if self._last_request is not None:
+            self._request_period = 0.8 * self._request_period + 0.2 * (now - self._last_request)
+        self._last_request = now
+        with self._frame_ready:
+            self._next_request = now + self._request_period
+            self._waiting = True
+            while self._latest_frame is None and self._capturing:
+                self._frame_ready.wait()
+            self._waiting = False
+            frame, self._latest_frame = self._latest_frame, None
+        if frame is None:
+            return None
+        if self._flip_buf is None or self._flip_buf.shape != frame.shape:
+            self._flip_buf = np.empty_like(frame)
+        cv2.flip(frame, 1, dst=self._flip_buf)  # Mirror the frame
+        return self._flip_buf
+    
+    def release(self):
+        """Stop the capture thread and release the webcam"""
+        self._capturing = False
+        if self._capture_thread is not None:
+            self._capture_thread.join()
+            self._capture_thread = None
+        if self.cap:
+            self.cap.release()
+
+class StaticFrameGate:
+    """Spots frames that are nearly identical to the last one sent to inference"""
+    
+    def __init__(self, threshold=STATIC_FRAME_THRESHOLD, max_age=STATIC_FRAME_MAX_AGE):
+        self.threshold = threshold
+        self.max_age = max_age
+        self._thumb = np.empty((32, 32, 3), dtype=np.uint8)
+        self._ref_thumb = np.empty((32, 32, 3), dtype=np.uint8)
+        self._age = None  # Frames since the reference thumbnail was taken
+    
+    def is_static(self, frame):
+        """True if the previous results still hold; otherwise frame becomes the new reference"""
+        cv2.resize(frame, (32, 32), dst=self._thumb, interpolation=cv2.INTER_AREA)
+        if (self._age is not None and self._age < self.max_age
+                and cv2.norm(self._thumb, self._ref_thumb, cv2.NORM_INF) <= self.threshold):
+            self._age += 1
+            return True
+        # Compare against the last inferred frame, not the previous one, so
+        # slow movement can't creep past the threshold a frame at a time
+        self._thumb, self._ref_thumb = self._ref_thumb, self._thumb
+        self._age = 0
+        return False
+    
+    def reset(self):
+        """Force the next frame through inference"""
+        self._age = None
+
 class HandTracker:
     """Base class for hand tracking functionality"""
     
-    def __init__(self):
+    def __init__(self, model_complexity=1, inference_scale=0.5, use_gpu=False,
+                 use_tasks=False, model_path='hand_landmarker.task',
+                 skip_static_frames=False, target_fps=None):
         # Initialize MediaPipe Hands
+        # High detection / lower tracking confidence keeps MediaPipe on the
+        # landmark-tracking path and only re-runs palm detection on real loss.
+        # model_complexity=0 selects the lite landmark model.
+        # inference_scale shrinks the frame fed to MediaPipe; landmarks come
+        # back normalized so they still map onto the full-size frame.
+        # use_tasks runs the MediaPipe Tasks HandLandmarker (model_path) in
+        # live-stream mode on the XNNPACK CPU delegate instead of the Hands
+        # solution; use_gpu does the same on the GPU delegate.
+        # skip_static_frames reuses the previous results while the camera
+        # image stays practically unchanged (see StaticFrameGate).
+        # target_fps shrinks the inference frame further while detection is
+        # slower than that frame rate, and grows it back once it catches up.
         self.mp_hands = mp.solutions.hands
         self.mp_drawing = mp.solutions.drawing_utils
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7
+        self.hands = None
+        self.landmarker = None
+        if use_gpu or use_tasks:
+            self._init_landmarker(model_path, use_gpu)
+        else:
+            self.hands = self.mp_hands.Hands(
+                static_image_mode=False,
+                max_num_hands=1,
+                model_complexity=model_complexity,
+                min_detection_confidence=0.8,
+                min_tracking_confidence=0.5
+            )
+        self.inference_scale = inference_scale
+        self.camera = CameraStream()
+        self._static_gate = StaticFrameGate() if skip_static_frames else None
+        self._last_results = None
+        self.target_fps = target_fps
+        self._base_inference_scale = inference_scale
+        self._scale_step = 0
+        self._ema_inference_ms = None
+        self._slow_frames = 0
+        self._fast_since = None
+        # Reused per-frame buffers (allocated on first frame / size change)
+        self._inference_shape = None
+        self._small_buf = None
+        self._rgb_buf = None
+    
+    def _init_landmarker(self, model_path, use_gpu):
+        """Create a live-stream HandLandmarker on the CPU or GPU delegate"""
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+        
+        base_options = mp_tasks.BaseOptions(
+            model_asset_path=model_path,
+            delegate=(mp_tasks.BaseOptions.Delegate.GPU if use_gpu
+                      else mp_tasks.BaseOptions.Delegate.CPU)
         )
-        self.cap = None
+        options = vision.HandLandmarkerOptions(
+            base_options=base_options,
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=1,
+            min_hand_detection_confidence=0.8,
+            min_tracking_confidence=0.5,
+            result_callback=self._on_landmarker_result
+        )
+        self._result_lock = threading.Lock()
+        self._latest_result = SimpleNamespace(multi_hand_landmarks=None)
+        self._last_timestamp_ms = 0
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+    
+    def _on_landmarker_result(self, result, output_image, timestamp_ms):
+        """Store the newest async result in the same shape as Hands.process"""
+        from mediapipe.framework.formats import landmark_pb2
+        
+        hands = [
+            landmark_pb2.NormalizedLandmarkList(landmark=[
+                landmark_pb2.NormalizedLandmark(x=l.x, y=l.y, z=l.z) for l in hand
+            ])
+            for hand in result.hand_landmarks
+        ]
+        with self._result_lock:
+            self._latest_result = SimpleNamespace(multi_hand_landmarks=hands or None)
+    
+    def _process_async(self, rgb):
+        """Submit a frame to the landmarker and return the latest result"""
+        # Live-stream timestamps must be strictly increasing
+        timestamp_ms = max(int(time.monotonic() * 1000), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+        self.landmarker.detect_async(image, timestamp_ms)
+        with self._result_lock:
+            return self._latest_result
     
     def start_camera(self, camera_index=0):
-        """Start the webcam"""
-        self.cap = cv2.VideoCapture(camera_index)
-        return self.cap.isOpened()
+        """Start the webcam and its background capture thread"""
+        return self.camera.start(camera_index)
     
     def get_frame(self):
-        """Get a frame from the camera"""
-        if self.cap is None:
+        """Get a frame from the camera (the frame buffer is reused on the next call)"""
+        frame = self.get_raw_frame()
+        if frame is None:
             return None, None
-        ret, frame = self.cap.read()
-        if ret:
-            frame = cv2.flip(frame, 1)  # Mirror the frame
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(rgb)
-            return frame, results
-        return None, None
+        return frame, self.process_frame(frame)
+    
+    def get_raw_frame(self):
+        """Get the latest mirrored camera frame without running hand detection"""
+        return self.camera.read()
+    
+    def process_frame(self, frame):
+        """Run hand detection on a BGR frame"""
+        if self._rgb_buf is None or self._inference_shape != frame.shape:
+            self._allocate_inference_buffers(frame.shape)
+            if self._static_gate is not None:
+                self._static_gate.reset()
+        # Unchanged frame: skip the resize, color conversion and inference
+        if self._static_gate is not None and self._static_gate.is_static(frame):
+            return self._last_results
+        start = time.perf_counter()
+        small = frame
+        if self._small_buf is not None:
+            cv2.resize(frame, self._small_buf.shape[1::-1],
+                       dst=self._small_buf, interpolation=cv2.INTER_AREA)
+            small = self._small_buf
+        self._rgb_buf.flags.writeable = True
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        # Read-only input lets MediaPipe wrap the buffer without a defensive copy
+        self._rgb_buf.flags.writeable = False
+        if self.landmarker is not None:
+            self._last_results = self._process_async(self._rgb_buf)
+        else:
+            self._last_results = self.hands.process(self._rgb_buf)
+        if self.target_fps:
+            self._adapt_inference_scale((time.perf_counter() - start) * 1000)
+        return self._last_results
+    
+    def _adapt_inference_scale(self, inference_ms):
+        """Step the inference frame size down/up as detection falls behind/catches up"""
+        if self._ema_inference_ms is None:
+            self._ema_inference_ms = inference_ms
+        else:
+            self._ema_inference_ms += 0.1 * (inference_ms - self._ema_inference_ms)
+        budget_ms = 1000 / self.target_fps
+        step = self._scale_step
+        
+        if self._ema_inference_ms > 1.3 * budget_ms:
+            self._fast_since = None
+            self._slow_frames += 1
+            if self._slow_frames >= ADAPTIVE_SLOW_FRAMES and step < len(ADAPTIVE_SCALE_STEPS) - 1:
+                step += 1
+        elif self._ema_inference_ms < 0.6 * budget_ms:
+            self._slow_frames = 0
+            now = time.monotonic()
+            if self._fast_since is None:
+                self._fast_since = now
+            elif now - self._fast_since >= ADAPTIVE_RECOVER_SECONDS and step > 0:
+                step -= 1
+        else:
+            self._slow_frames = 0
+            self._fast_since = None
+        
+        if step != self._scale_step:
+            self._scale_step = step
+            self.inference_scale = self._base_inference_scale * ADAPTIVE_SCALE_STEPS[step]
+            self._inference_shape = None  # Reallocate buffers at the new size
+            self._ema_inference_ms = None
+            self._slow_frames = 0
+            self._fast_since = None
+    
+    def _allocate_inference_buffers(self, frame_shape):
+        """Allocate the downscale and RGB buffers for a frame size"""
+        h, w = frame_shape[:2]
+        self._inference_shape = frame_shape
+        self._small_buf = None
+        if self.inference_scale != 1.0:
+            small_shape = (int(h * self.inference_scale), int(w * self.inference_scale), 3)
+            self._small_buf = np.empty(small_shape, dtype=np.uint8)
+        self._rgb_buf = np.empty(self._small_buf.shape if self._small_buf is not None
+                                 else frame_shape, dtype=np.uint8)
     
     def get_landmarks(self, results, frame_shape):
-        """Extract hand landmarks as pixel coordinates"""
+        """Extract hand landmarks as a (21, 2) int32 pixel array per hand ('px', indexed by Lm)"""
         if not results.multi_hand_landmarks:
             return None
         
         h, w, _ = frame_shape
+        scale = np.array([w, h], dtype=np.float64)
         landmarks = []
         
         for hand_landmarks in results.multi_hand_landmarks:
-            lm = [(int(l.x * w), int(l.y * h)) for l in hand_landmarks.landmark]
+            coords = np.fromiter(
+                (c for l in hand_landmarks.landmark for c in (l.x, l.y)),
+                dtype=np.float64, count=42
+            ).reshape(21, 2)
             landmarks.append({
-                'landmarks': lm,
-                'hand_landmarks': hand_landmarks,
-                'palm': lm[9],  # Middle finger MCP (palm center)
-                'wrist': lm[0],
-                'thumb_tip': lm[4],
-                'index_tip': lm[8],
-                'middle_tip': lm[12],
-                'ring_tip': lm[16],
-                'pinky_tip': lm[20],
-                'fingers': {
-                    'thumb': [lm[2], lm[3], lm[4]],
-                    'index': [lm[5], lm[6], lm[7], lm[8]],
-                    'middle': [lm[9], lm[10], lm[11], lm[12]],
-                    'ring': [lm[13], lm[14], lm[15], lm[16]],
-                    'pinky': [lm[17], lm[18], lm[19], lm[20]]
-                }
+                'px': (coords * scale).astype(np.int32),
+                'hand_landmarks': hand_landmarks
             })
         
         return landmarks
     
-    def draw_hand_skeleton(self, frame, hand_landmarks):
-        """Draw the hand skeleton on the frame"""
-        self.mp_drawing.draw_landmarks(
-            frame, 
-            hand_landmarks, 
-            self.mp_hands.HAND_CONNECTIONS
-        )
+    def draw_hand_skeleton(self, frame, landmarks):
+        """Draw the hand skeleton on the frame (mp_drawing's default look)"""
+        px = landmarks['px']
+        # Every bone in one call instead of a cv2.line per connection
+        cv2.polylines(frame, px[HAND_CONNECTIONS], False, (224, 224, 224), 2)
+        # Joints: red dots with a white rim
+        joints = px[JOINT_SEGMENTS]
+        cv2.polylines(frame, joints, False, (255, 255, 255), 9)
+        cv2.polylines(frame, joints, False, (0, 0, 255), 7)
+    
+    def get_fingers_up(self, landmarks):
+        """Up/down state of all five fingers as a boolean array (cached per hand)"""
+        up = landmarks.get('fingers_up')
+        if up is None:
+            px = landmarks['px']
+            tips = px[FINGER_TIP_IDX]
+            bases = px[FINGER_BASE_IDX]
+            # Other fingers: check if tip is above the joint
+            up = tips[:, 1] < bases[:, 1]
+            # Thumb: check if tip is to the right of the joint
+            up[0] = tips[0, 0] > bases[0, 0]
+            landmarks['fingers_up'] = up
+        return up
     
     def is_finger_up(self, landmarks, finger_name):
         """Check if a finger is extended (up)"""
-        finger_points = landmarks['fingers'][finger_name]
-        
-        if finger_name == 'thumb':
-            # Thumb: check if tip is to the right of the joint
-            return finger_points[2][0] > finger_points[0][0]
-        else:
-            # Other fingers: check if tip is above the joint
-            return finger_points[3][1] < finger_points[0][1]
+        return bool(self.get_fingers_up(landmarks)[FINGER_INDEX[finger_name]])
     
     def get_finger_count(self, landmarks):
         """Count how many fingers are up"""
-        count = 0
-        for finger in ['thumb', 'index', 'middle', 'ring', 'pinky']:
-            if self.is_finger_up(landmarks, finger):
-                count += 1
-        return count
+        return int(self.get_fingers_up(landmarks).sum())
     
     def get_distance(self, point1, point2):
         """Calculate distance between two points"""
-        return np.linalg.norm(np.array(point1) - np.array(point2))
+        return math.hypot(point1[0] - point2[0], point1[1] - point2[1])
+    
+    def get_distances_to(self, points, point):
+        """Distances from each row of an (N, 2) point array to one point"""
+        return np.linalg.norm(points - point, axis=1)
+    
+    def get_distances_matrix(self, px):
+        """Pairwise distances between all rows of an (N, 2) point array"""
+        px = np.asarray(px, dtype=np.float32)
+        return np.linalg.norm(px[None, :] - px[:, None], axis=-1)
     
     def release(self):
         """Release the camera"""
-        if self.cap:
-            self.cap.release()
+        self.camera.release()
+        if self.landmarker is not None:
+            self.landmarker.close()
         cv2.destroyAllWindows()
 
@@ -4,8 +4,9 @@ Futuristic AR UI with scary colors
 """
 import cv2
 import numpy as np
-from base import HandTracker
-from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen
+from base import HandTracker, Lm, FINGER_TIP_IDX
+from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen, is_window_visible, idle_frame, poll_key
+from overlay_helper import put_cached_text
 
 # Colors for UI overlays (scary/horror theme)
 CYAN = (0, 0, 139)  # Dark red/crimson
@@ -16,11 +17,19 @@ CORE = (139, 0, 139)  # Dark purple (glowing)
 
 def draw_glow_circle(img, center, radius, color, thickness=2, glow=15):
     """Draw a circle with glow effect"""
-    for g in range(glow, 0, -3):
-        alpha = 0.08 + 0.12 * (g / glow)
-        overlay = img.copy()
-        cv2.circle(overlay, center, radius+g, color, thickness)
-        cv2.addWeighted(overlay, alpha, img, 1-alpha, 0, img)
+    # Blend only the glow's bounding box instead of copying the whole frame
+    reach = radius + glow + thickness + 1
+    x0, y0 = max(center[0] - reach, 0), max(center[1] - reach, 0)
+    x1, y1 = min(center[0] + reach + 1, img.shape[1]), min(center[1] + reach + 1, img.shape[0])
+    if x0 < x1 and y0 < y1:
+        roi = img[y0:y1, x0:x1]
+        overlay = np.empty_like(roi)
+        roi_center = (center[0] - x0, center[1] - y0)
+        for g in range(glow, 0, -3):
+            alpha = 0.08 + 0.12 * (g / glow)
+            overlay[:] = roi
+            cv2.circle(overlay, roi_center, radius+g, color, thickness)
+            cv2.addWeighted(overlay, alpha, roi, 1-alpha, 0, dst=roi)
     cv2.circle(img, center, radius, color, thickness)
 
 def draw_radial_ticks(img, center, radius, color, num_ticks=24, length=22, thickness=3):
@@ -65,7 +74,7 @@ def draw_arc_segments(img, center):
     cv2.ellipse(img, center, (80,80), 0, 0, 360, CYAN, 1)
 
 def main():
-    tracker = HandTracker()
+    tracker = HandTracker(target_fps=30)  # Full model: shrink its input if it falls behind
     
     if not tracker.start_camera():
         print("Error: Could not open camera")
@@ -77,6 +86,12 @@ def main():
     fullscreen = setup_fullscreen_window('Hand Tracking AR UI', start_fullscreen=False)
     
     while True:
+        if not is_window_visible('Hand Tracking AR UI'):
+            # Window hidden: skip hand detection and drawing
+            if not idle_frame('Hand Tracking AR UI'):
+                break
+            continue
+        
         frame, results = tracker.get_frame()
         if frame is None:
             break
@@ -85,17 +100,15 @@ def main():
         
         if landmarks_list:
             landmarks = landmarks_list[0]
-            palm = landmarks['palm']
-            lm = landmarks['landmarks']
+            lm = landmarks['px']
+            palm = lm[Lm.PALM]
             
             # Calculate gesture metrics
-            tips = [landmarks['thumb_tip'], landmarks['index_tip'], 
-                   landmarks['middle_tip'], landmarks['ring_tip'], landmarks['pinky_tip']]
-            dists = [tracker.get_distance(tip, palm) for tip in tips]
-            avg_dist = np.mean(dists)
+            tips = lm[FINGER_TIP_IDX]
+            avg_dist = tracker.get_distances_to(tips, palm).mean()
             
             # Pinch detection
-            pinch_dist = tracker.get_distance(landmarks['thumb_tip'], landmarks['index_tip'])
+            pinch_dist = tracker.get_distance(lm[Lm.THUMB_TIP], lm[Lm.INDEX_TIP])
             pinch_val = int(100 - min(pinch_dist, 100))
             
             # Gesture logic
@@ -115,30 +128,31 @@ def main():
                     cv2.circle(frame, lm[i], 12, ORANGE, -1)
                 
                 # Angle calculation
-                v1 = np.array(landmarks['thumb_tip']) - np.array(palm)
-                v2 = np.array(landmarks['index_tip']) - np.array(palm)
+                v1 = lm[Lm.THUMB_TIP] - palm
+                v2 = lm[Lm.INDEX_TIP] - palm
                 try:
                     angle = int(np.degrees(np.arccos(np.dot(v1, v2)/(np.linalg.norm(v1)*np.linalg.norm(v2)+1e-6))))
                 except:
                     angle = 0
+                # Per-frame values are drawn directly rather than cached
                 cv2.putText(frame, f'{angle}°', (palm[0]+40, palm[1]-40), 
-                           cv2.FONT_HERSHEY_DUPLEX, 1.5, (0, 0, 0), 4)
+                               cv2.FONT_HERSHEY_DUPLEX, 1.5, (0, 0, 0), 4)
             elif pinch_val < 60:
                 # Pinch gesture
                 draw_glow_circle(frame, palm, 60, ORANGE, 3, glow=20)
                 cv2.putText(frame, f'Pinch: {pinch_val}', (palm[0]-40, palm[1]-70), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, ORANGE, 3)
+                               cv2.FONT_HERSHEY_SIMPLEX, 1, ORANGE, 3)
                 for i in range(5):
                     cv2.ellipse(frame, (palm[0]+80, palm[1]), (30,30), 0, 180, 
                               180+pinch_val+i*10, ORANGE, 2)
             else:
                 # Fist
                 draw_glow_circle(frame, palm, 60, CYAN, 3, glow=20)
-                cv2.putText(frame, 'FIST', (palm[0]-30, palm[1]-70), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, ORANGE, 3)
+                put_cached_text(frame, 'FIST', (palm[0]-30, palm[1]-70), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 1, ORANGE, 3)
         
         cv2.imshow('Hand Tracking AR UI', frame)
-        key = cv2.waitKey(1) & 0xFF
+        key = poll_key()
         if key == 27:  # ESC
             break
         elif key == ord('f') or key == ord('F'):  # Toggle fullscreen
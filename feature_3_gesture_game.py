@@ -6,34 +6,38 @@ Author: Kabir Suri (codingkabs)
 import cv2
 import random
 import time
-from base import HandTracker
-from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen
+from base import HandTracker, Lm, FINGER_BITS
+from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen, is_window_visible, idle_frame, poll_key
+from overlay_helper import get_text_size, put_cached_text
+
+# Run hand detection every N frames while the gesture is only used for
+# drawing/button hover; the SHOOT moment always gets a fresh detection
+INFERENCE_INTERVAL = 3
+
+# Finger mask (thumb<<4 | index<<3 | middle<<2 | ring<<1 | pinky) -> gesture
+_GESTURES = {
+    0b00000: "ROCK",      # Fist
+    0b11111: "PAPER",     # Open hand
+    0b01100: "SCISSORS",  # V shape: only index and middle up
+}
 
 def detect_gesture(landmarks, tracker):
     """Detect rock, paper, or scissors gesture"""
-    finger_count = tracker.get_finger_count(landmarks)
-    
-    if finger_count == 0:
-        return "ROCK"
-    elif finger_count == 5:
-        return "PAPER"
-    elif finger_count == 2:
-        # Check if it's V shape (scissors)
-        if tracker.is_finger_up(landmarks, 'index') and tracker.is_finger_up(landmarks, 'middle'):
-            return "SCISSORS"
-    return "UNKNOWN"
+    mask = int(tracker.get_fingers_up(landmarks) @ FINGER_BITS)
+    return _GESTURES.get(mask, "UNKNOWN")
+
+_CHOICES = ("ROCK", "PAPER", "SCISSORS")
+_BEATS = {"ROCK": "SCISSORS", "PAPER": "ROCK", "SCISSORS": "PAPER"}
 
 def get_computer_choice():
     """Get random computer choice"""
-    return random.choice(["ROCK", "PAPER", "SCISSORS"])
+    return _CHOICES[random.randrange(3)]
 
 def determine_winner(player, computer):
     """Determine game winner"""
     if player == computer:
         return "TIE", 0, 0  # 0 = tie, 1 = player wins, 2 = computer wins
-    elif (player == "ROCK" and computer == "SCISSORS") or \
-         (player == "PAPER" and computer == "ROCK") or \
-         (player == "SCISSORS" and computer == "PAPER"):
+    elif _BEATS[player] == computer:
         return "YOU WIN!", 1, 0
     else:
         return "COMPUTER WINS!", 0, 1
@@ -43,11 +47,11 @@ def draw_button(frame, x, y, width, height, text, color=(100, 100, 100)):
     cv2.rectangle(frame, (x, y), (x + width, y + height), color, -1)
     cv2.rectangle(frame, (x, y), (x + width, y + height), (255, 255, 255), 2)
     
-    text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
+    text_size = get_text_size(text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
     text_x = x + (width - text_size[0]) // 2
     text_y = y + (height + text_size[1]) // 2
-    cv2.putText(frame, text, (text_x, text_y),
-               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    put_cached_text(frame, text, (text_x, text_y),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
     return (x, y, x + width, y + height)
 
 def check_button_click(point, button_area):
@@ -56,7 +60,7 @@ def check_button_click(point, button_area):
     return x <= point[0] <= x2 and y <= point[1] <= y2
 
 def main():
-    tracker = HandTracker()
+    tracker = HandTracker(model_complexity=0)  # Only finger up/down is used
     
     if not tracker.start_camera():
         print("Error: Could not open camera")
@@ -81,12 +85,26 @@ def main():
     computer_choice = None
     result_text = None
     last_frame_time = time.time()
+    frame_count = 0
+    results = None
     fullscreen = setup_fullscreen_window('Rock Paper Scissors', start_fullscreen=False)
     
     while True:
-        frame, results = tracker.get_frame()
+        if not is_window_visible('Rock Paper Scissors'):
+            # Window hidden: skip hand detection and drawing
+            if not idle_frame('Rock Paper Scissors'):
+                break
+            continue
+        
+        frame = tracker.get_raw_frame()
         if frame is None:
             break
+        h, w = frame.shape[:2]
+        
+        frame_count += 1
+        shoot_pending = game_state == "COUNTDOWN" and countdown_number == 0
+        if results is None or shoot_pending or frame_count % INFERENCE_INTERVAL == 0:
+            results = tracker.process_frame(frame)
         
         current_time = time.time()
         frame_time = current_time - last_frame_time
@@ -97,8 +115,8 @@ def main():
         # Draw hand skeleton if hand detected
         if landmarks_list:
             landmarks = landmarks_list[0]
-            tracker.draw_hand_skeleton(frame, landmarks['hand_landmarks'])
-            index_tip = landmarks['index_tip']
+            tracker.draw_hand_skeleton(frame, landmarks)
+            index_tip = landmarks['px'][Lm.INDEX_TIP]
         else:
             index_tip = None
         
@@ -106,27 +124,23 @@ def main():
         if game_state == "MENU":
             # Draw start button
             button_area = draw_button(frame, 
-                                     frame.shape[1] // 2 - 150, 
-                                     frame.shape[0] // 2 - 25,
+                                     w // 2 - 150, 
+                                     h // 2 - 25,
                                      300, 50, 
                                      "START GAME", 
                                      (0, 200, 0))
             
-            # Check for button click or 'S' key
-            if index_tip and check_button_click(index_tip, button_area):
-                game_state = "COUNTDOWN"
-                countdown_number = 3
-                countdown_start_time = current_time
-            elif cv2.waitKey(1) & 0xFF == ord('s'):
+            # Check for button click ('S' key is handled with the other keys)
+            if index_tip is not None and check_button_click(index_tip, button_area):
                 game_state = "COUNTDOWN"
                 countdown_number = 3
                 countdown_start_time = current_time
             
             # Display scores
-            cv2.putText(frame, f"Player: {player_score}  |  Computer: {computer_score}", 
-                       (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            cv2.putText(frame, "First to 5 points wins!", 
-                       (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 2)
+            put_cached_text(frame, f"Player: {player_score}  |  Computer: {computer_score}", 
+                           (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+            put_cached_text(frame, "First to 5 points wins!", 
+                           (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 2)
         
         elif game_state == "COUNTDOWN":
             elapsed = current_time - countdown_start_time
@@ -140,11 +154,11 @@ def main():
             # Display countdown
             if countdown_number > 0:
                 countdown_text = str(countdown_number)
-                text_size = cv2.getTextSize(countdown_text, cv2.FONT_HERSHEY_SIMPLEX, 5, 10)[0]
-                text_x = (frame.shape[1] - text_size[0]) // 2
-                text_y = (frame.shape[0] + text_size[1]) // 2
-                cv2.putText(frame, countdown_text, (text_x, text_y),
-                           cv2.FONT_HERSHEY_SIMPLEX, 5, (0, 255, 255), 10)
+                text_size = get_text_size(countdown_text, cv2.FONT_HERSHEY_SIMPLEX, 5, 10)[0]
+                text_x = (w - text_size[0]) // 2
+                text_y = (h + text_size[1]) // 2
+                put_cached_text(frame, countdown_text, (text_x, text_y),
+                               cv2.FONT_HERSHEY_SIMPLEX, 5, (0, 255, 255), 10)
             elif elapsed >= 0.5:  # After "SHOOT"
                 # Detect gesture
                 if landmarks_list:
@@ -168,20 +182,20 @@ def main():
             elapsed = current_time - result_start_time
             
             # Display choices
-            cv2.putText(frame, f'You: {player_choice}', (50, 100), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
-            cv2.putText(frame, f'Computer: {computer_choice}', (50, 150), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 0, 0), 3)
+            put_cached_text(frame, f'You: {player_choice}', (50, 100), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
+            put_cached_text(frame, f'Computer: {computer_choice}', (50, 150), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 0, 0), 3)
             
             # Display result
-            result_size = cv2.getTextSize(result_text, cv2.FONT_HERSHEY_SIMPLEX, 2, 4)[0]
-            result_x = (frame.shape[1] - result_size[0]) // 2
-            cv2.putText(frame, result_text, (result_x, 250), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 4)
+            result_size = get_text_size(result_text, cv2.FONT_HERSHEY_SIMPLEX, 2, 4)[0]
+            result_x = (w - result_size[0]) // 2
+            put_cached_text(frame, result_text, (result_x, 250), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 4)
             
             # Display scores
-            cv2.putText(frame, f"Player: {player_score}  |  Computer: {computer_score}", 
-                       (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+            put_cached_text(frame, f"Player: {player_score}  |  Computer: {computer_score}", 
+                           (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
             
             if elapsed >= 3.0:
                 # Check for victory
@@ -194,55 +208,59 @@ def main():
         elif game_state == "VICTORY":
             # Show victory screen
             winner = "YOU WIN THE GAME!" if player_score >= 5 else "COMPUTER WINS THE GAME!"
-            winner_size = cv2.getTextSize(winner, cv2.FONT_HERSHEY_SIMPLEX, 2, 4)[0]
-            winner_x = (frame.shape[1] - winner_size[0]) // 2
+            winner_size = get_text_size(winner, cv2.FONT_HERSHEY_SIMPLEX, 2, 4)[0]
+            winner_x = (w - winner_size[0]) // 2
             
-            cv2.putText(frame, winner, (winner_x, frame.shape[0] // 2 - 50), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 4)
-            cv2.putText(frame, f"Final Score: {player_score} - {computer_score}", 
-                       (frame.shape[1] // 2 - 200, frame.shape[0] // 2 + 50), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+            put_cached_text(frame, winner, (winner_x, h // 2 - 50), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 4)
+            put_cached_text(frame, f"Final Score: {player_score} - {computer_score}", 
+                           (w // 2 - 200, h // 2 + 50), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
             
             # Draw replay button
             replay_button = draw_button(frame,
-                                       frame.shape[1] // 2 - 150,
-                                       frame.shape[0] // 2 + 100,
+                                       w // 2 - 150,
+                                       h // 2 + 100,
                                        300, 50,
                                        "PLAY AGAIN",
                                        (0, 200, 0))
             
             # Check for replay
-            if index_tip and check_button_click(index_tip, replay_button):
+            if index_tip is not None and check_button_click(index_tip, replay_button):
                 # Reset game
                 player_score = 0
                 computer_score = 0
                 game_state = "MENU"
-            elif cv2.waitKey(1) & 0xFF == ord('r'):
-                player_score = 0
-                computer_score = 0
-                game_state = "MENU"
         
         # Instructions
         if game_state == "COUNTDOWN":
-            cv2.putText(frame, "Show your gesture!", 
-                       (50, frame.shape[0] - 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            put_cached_text(frame, "Show your gesture!", 
+                           (50, h - 30), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
         elif game_state == "MENU":
-            cv2.putText(frame, "Fist=Rock | Open=Paper | V=Scissors | Press 'S' to start", 
-                       (50, frame.shape[0] - 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            put_cached_text(frame, "Fist=Rock | Open=Paper | V=Scissors | Press 'S' to start", 
+                           (50, h - 30), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         else:
-            cv2.putText(frame, "Press ESC to exit", 
-                       (50, frame.shape[0] - 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            put_cached_text(frame, "Press ESC to exit", 
+                           (50, h - 30), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
         cv2.imshow('Rock Paper Scissors', frame)
         
-        key = cv2.waitKey(1) & 0xFF
+        key = poll_key()
         if key == 27:  # ESC
             break
         elif key == ord('f') or key == ord('F'):  # Toggle fullscreen
             fullscreen = toggle_fullscreen('Rock Paper Scissors', fullscreen)
+        elif key == ord('s') and game_state == "MENU":  # Start from the keyboard
+            game_state = "COUNTDOWN"
+            countdown_number = 3
+            countdown_start_time = current_time
+        elif key == ord('r') and game_state == "VICTORY":  # Replay from the keyboard
+            player_score = 0
+            computer_score = 0
+            game_state = "MENU"
     
     tracker.release()
     print("\nThanks for playing!")
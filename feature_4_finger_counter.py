@@ -2,12 +2,14 @@
 Feature 4: Finger Counter
 Counts how many fingers are up and displays it
 """
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 from base import HandTracker
-from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen
+from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen, is_window_visible, idle_frame, poll_key
+from overlay_helper import get_text_size, put_cached_text
 
 def main():
-    tracker = HandTracker()
+    tracker = HandTracker(model_complexity=0)  # Only finger up/down is used
     
     if not tracker.start_camera():
         print("Error: Could not open camera")
@@ -18,28 +20,47 @@ def main():
     print("Show your hand and see how many fingers are detected!")
     
     fullscreen = setup_fullscreen_window('Finger Counter', start_fullscreen=False)
+    # Hand detection runs on a worker thread; each frame is drawn with the
+    # most recent finished result (typically one frame behind)
+    detector = ThreadPoolExecutor(max_workers=1)
+    pending = None
+    results = None
     
     while True:
-        frame, results = tracker.get_frame()
+        if not is_window_visible('Finger Counter'):
+            # Window hidden: skip hand detection and drawing
+            if not idle_frame('Finger Counter'):
+                break
+            continue
+        
+        frame = tracker.get_raw_frame()
         if frame is None:
             break
+        h, w = frame.shape[:2]
+        
+        if pending is not None and pending.done():
+            results = pending.result()
+            pending = None
+        if pending is None:
+            # The frame buffer is reused by the next get_raw_frame(), so submit a copy
+            pending = detector.submit(tracker.process_frame, frame.copy())
         
-        landmarks_list = tracker.get_landmarks(results, frame.shape)
+        landmarks_list = tracker.get_landmarks(results, frame.shape) if results is not None else None
         
         if landmarks_list:
             landmarks = landmarks_list[0]
             
             # Draw hand skeleton
-            tracker.draw_hand_skeleton(frame, landmarks['hand_landmarks'])
+            tracker.draw_hand_skeleton(frame, landmarks)
             
             # Count fingers
             finger_count = tracker.get_finger_count(landmarks)
             
             # Display count in large text (slightly lower position)
             text = str(finger_count)
-            text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 5, 10)[0]
-            text_x = (frame.shape[1] - text_size[0]) // 2
-            text_y = int(frame.shape[0] * 0.6)  # Slightly lower than center (60% down)
+            text_size = get_text_size(text, cv2.FONT_HERSHEY_SIMPLEX, 5, 10)[0]
+            text_x = (w - text_size[0]) // 2
+            text_y = int(h * 0.6)  # Slightly lower than center (60% down)
             
             # Draw background rectangle
             cv2.rectangle(frame, 
@@ -48,30 +69,30 @@ def main():
                          (0, 0, 0), -1)
             
             # Draw the number
-            cv2.putText(frame, text, (text_x, text_y), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 5, (0, 255, 0), 10)
+            put_cached_text(frame, text, (text_x, text_y), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 5, (0, 255, 0), 10)
             
             # Show which fingers are up (in black)
             finger_names = ['Thumb', 'Index', 'Middle', 'Ring', 'Pinky']
             finger_status = []
-            for i, finger in enumerate(['thumb', 'index', 'middle', 'ring', 'pinky']):
-                is_up = tracker.is_finger_up(landmarks, finger)
-                finger_status.append(f"{finger_names[i]}: {'UP' if is_up else 'DOWN'}")
+            for name, is_up in zip(finger_names, tracker.get_fingers_up(landmarks)):
+                finger_status.append(f"{name}: {'UP' if is_up else 'DOWN'}")
             
             y_offset = 30
             for status in finger_status:
-                cv2.putText(frame, status, (50, y_offset), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+                put_cached_text(frame, status, (50, y_offset), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
                 y_offset += 25
         
         cv2.imshow('Finger Counter', frame)
         
-        key = cv2.waitKey(1) & 0xFF
+        key = poll_key()
         if key == 27:  # ESC
             break
         elif key == ord('f') or key == ord('F'):  # Toggle fullscreen
             fullscreen = toggle_fullscreen('Finger Counter', fullscreen)
     
+    detector.shutdown(wait=True)
     tracker.release()
 
 if __name__ == "__main__":
@@ -4,12 +4,14 @@ Draw in the air with your finger - different gestures change colors
 """
 import cv2
 import numpy as np
-from base import HandTracker
-from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen
+from base import HandTracker, Lm
+from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen, is_window_visible, idle_frame, poll_key
+from overlay_helper import put_cached_text
 
 class VirtualCanvas:
     def __init__(self, width, height):
-        self.canvas = np.ones((height, width, 3), dtype=np.uint8) * 255  # White canvas
+        self.canvas = np.full((height, width, 3), 255, dtype=np.uint8)  # White canvas
+        self.ink_mask = np.zeros((height, width), dtype=np.uint8)  # 255 where drawn
         self.current_color = (0, 0, 255)  # Red by default
         self.colors = [
             (0, 0, 255),    # Red
@@ -32,21 +34,48 @@ class VirtualCanvas:
         """Draw a point on canvas"""
         if point is None:
             return
+        point = (int(point[0]), int(point[1]))
+        last_point = self.last_point
+        if point == last_point:
+            return  # Pen hasn't moved - the stroke already covers this spot
         
-        if self.last_point is not None and self.drawing:
-            cv2.line(self.canvas, self.last_point, point, self.current_color, thickness)
+        if last_point is not None and self.drawing:
+            cv2.line(self.canvas, last_point, point, self.current_color, thickness, cv2.LINE_8)
+            cv2.line(self.ink_mask, last_point, point, 255, thickness, cv2.LINE_8)
         else:
-            cv2.circle(self.canvas, point, thickness, self.current_color, -1)
+            cv2.circle(self.canvas, point, thickness, self.current_color, -1, cv2.LINE_8)
+            cv2.circle(self.ink_mask, point, thickness, 255, -1, cv2.LINE_8)
         
         self.last_point = point
     
+    def erase(self, point, radius=20):
+        """Erase a circular area of the canvas"""
+        cv2.circle(self.canvas, point, radius, (255, 255, 255), -1)
+        cv2.circle(self.ink_mask, point, radius, 0, -1)
+    
+    def resize(self, width, height):
+        """Resize the canvas (and its ink mask) to a new frame size"""
+        self.canvas = cv2.resize(self.canvas, (width, height))
+        self.ink_mask = cv2.resize(self.ink_mask, (width, height), interpolation=cv2.INTER_NEAREST)
+    
+    def blend_onto(self, frame, alpha=0.6):
+        """Blend the drawn strokes onto a frame in place (white background is skipped)"""
+        # Only the bounding box of the ink is blended, then copied through the mask
+        x, y, w, h = cv2.boundingRect(self.ink_mask)
+        if w == 0 or h == 0:
+            return
+        roi = frame[y:y + h, x:x + w]
+        mixed = cv2.addWeighted(roi, 1 - alpha, self.canvas[y:y + h, x:x + w], alpha, 0)
+        cv2.copyTo(mixed, self.ink_mask[y:y + h, x:x + w], roi)
+    
     def clear(self):
         """Clear the canvas"""
-        self.canvas = np.ones_like(self.canvas) * 255
+        self.canvas.fill(255)
+        self.ink_mask.fill(0)
         self.last_point = None
 
 def main():
-    tracker = HandTracker()
+    tracker = HandTracker(target_fps=30)  # Full model: shrink its input if it falls behind
     
     if not tracker.start_camera():
         print("Error: Could not open camera")
@@ -60,19 +89,28 @@ def main():
     print("  - Open hand (5 fingers): Change color")
     
     fullscreen = setup_fullscreen_window('Virtual Drawing', start_fullscreen=False)
-    canvas = VirtualCanvas(1920, 1080)  # Match fullscreen size
+    canvas = None  # Allocated at the camera frame size on the first frame
     erase_mode = False
     last_finger_count = 0
     last_fist_state = False
     
     while True:
+        if not is_window_visible('Virtual Drawing'):
+            # Window hidden: skip hand detection and drawing
+            if not idle_frame('Virtual Drawing'):
+                break
+            continue
+        
         frame, results = tracker.get_frame()
         if frame is None:
             break
+        h, w = frame.shape[:2]
         
-        # Resize canvas to match frame
-        if frame.shape[:2] != canvas.canvas.shape[:2]:
-            canvas.canvas = cv2.resize(canvas.canvas, (frame.shape[1], frame.shape[0]))
+        # Size the canvas to the frame (resize only if the camera size changes)
+        if canvas is None:
+            canvas = VirtualCanvas(w, h)
+        elif (h, w) != canvas.canvas.shape[:2]:
+            canvas.resize(w, h)
         
         landmarks_list = tracker.get_landmarks(results, frame.shape)
         
@@ -80,9 +118,9 @@ def main():
             landmarks = landmarks_list[0]
             
             # Draw hand skeleton
-            tracker.draw_hand_skeleton(frame, landmarks['hand_landmarks'])
+            tracker.draw_hand_skeleton(frame, landmarks)
             
-            index_tip = landmarks['index_tip']
+            index_tip = landmarks['px'][Lm.INDEX_TIP]
             finger_count = tracker.get_finger_count(landmarks)
             
             # Gesture controls with debounce
@@ -91,16 +129,16 @@ def main():
                 if not last_fist_state:  # Only toggle once when fist is first made
                     erase_mode = not erase_mode
                     last_fist_state = True
-                    cv2.putText(frame, f"MODE: {'ERASE' if erase_mode else 'DRAW'}", (50, 50), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3)
+                    put_cached_text(frame, f"MODE: {'ERASE' if erase_mode else 'DRAW'}", (50, 50), 
+                                   cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3)
             else:
                 last_fist_state = False
             
             # Open hand (5 fingers) - Change color (only once per gesture)
             if finger_count == 5 and last_finger_count != 5:
                 canvas.change_color()
-                cv2.putText(frame, "COLOR CHANGED!", (50, 50), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1.5, canvas.current_color, 3)
+                put_cached_text(frame, "COLOR CHANGED!", (50, 50), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 1.5, canvas.current_color, 3)
             
             last_finger_count = finger_count
             
@@ -109,7 +147,7 @@ def main():
                 canvas.drawing = True
                 if erase_mode:
                     # Erase mode - draw white
-                    cv2.circle(canvas.canvas, index_tip, 20, (255, 255, 255), -1)
+                    canvas.erase(index_tip, 20)
                 else:
                     # Draw mode
                     canvas.draw_point(index_tip, thickness=8)
@@ -118,28 +156,23 @@ def main():
                 canvas.last_point = None
         
         # Overlay canvas on camera feed (keep camera feed at full color)
-        # Only blend the drawn parts, not the white background
-        blended = frame.copy()
-        # Create mask for drawn pixels (non-white areas)
-        mask = cv2.inRange(canvas.canvas, (0, 0, 0), (253, 253, 253))
-        # Only blend where there's actual drawing
-        blended[mask > 0] = cv2.addWeighted(frame[mask > 0], 0.4, canvas.canvas[mask > 0], 0.6, 0)
+        # Only blend the drawn parts, not the white background. The blend is
+        # written straight into the frame, which the tracker reuses each frame
+        canvas.blend_onto(frame, 0.6)
         
         # Show current color indicator
-        color_rect = np.zeros((50, 200, 3), dtype=np.uint8)
-        color_rect[:] = canvas.current_color
-        blended[10:60, 10:210] = color_rect
-        cv2.putText(blended, "Color", (220, 45), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        cv2.rectangle(frame, (10, 10), (209, 59), canvas.current_color, cv2.FILLED)
+        put_cached_text(frame, "Color", (220, 45), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
         # Show mode
         mode_text = "ERASE MODE" if erase_mode else "DRAW MODE"
-        cv2.putText(blended, mode_text, (50, frame.shape[0] - 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        put_cached_text(frame, mode_text, (50, h - 30), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
         
-        cv2.imshow('Virtual Drawing', blended)
+        cv2.imshow('Virtual Drawing', frame)
         
-        key = cv2.waitKey(1) & 0xFF
+        key = poll_key()
         if key == 27:  # ESC
             break
         elif key == ord('f') or key == ord('F'):  # Toggle fullscreen
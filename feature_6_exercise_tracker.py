@@ -6,13 +6,26 @@ Author: Kabir Suri (codingkabs)
 import cv2
 import time
 import numpy as np
-from pose_base import PoseTracker
+from pose_base import PoseTracker, Kp
+from fullscreen_helper import setup_fullscreen_window, toggle_fullscreen, is_window_visible, idle_frame, poll_key
+from overlay_helper import get_text_size, put_cached_text
+
+# HUD colors (BGR) and font
+GREEN = (0, 255, 0)
+WHITE = (255, 255, 255)
+GREY = (100, 100, 100)
+YELLOW = (0, 255, 255)
+BLACK = (0, 0, 0)
+FONT = cv2.FONT_HERSHEY_SIMPLEX
 
 class ExerciseTracker:
     def __init__(self):
         self.reps = 0
         self.exercise_start_time = time.time()
-        self.rep_times = []
+        # Running sum/count of rep-to-rep intervals for the average rep time
+        self._last_rep_time = None
+        self._interval_sum = 0.0
+        self._interval_count = 0
         self.position_1 = None  # First position (e.g., up for push-ups)
         self.position_2 = None  # Second position (e.g., down for push-ups)
         self.current_state = "position_1"  # Which position we're currently in
@@ -27,106 +40,101 @@ class ExerciseTracker:
         self.position_2 = key_point_y
         self.is_calibrated = True
     
-    def update(self, current_y):
-        """Track reps based on calibrated positions"""
+    def update(self, current_y, now):
+        """Track reps based on calibrated positions (now is the frame's timestamp)"""
         if not self.is_calibrated or self.position_1 is None or self.position_2 is None:
             return False
         
-        # Calculate thresholds (midpoint between positions)
-        threshold = (self.position_1 + self.position_2) / 2
-        
-        # Determine which position we're closer to
-        dist_to_pos1 = abs(current_y - self.position_1)
-        dist_to_pos2 = abs(current_y - self.position_2)
-        
-        # Determine current state
-        if dist_to_pos1 < dist_to_pos2:
+        # Current state is whichever calibrated position we're closer to
+        if abs(current_y - self.position_1) < abs(current_y - self.position_2):
             new_state = "position_1"
         else:
             new_state = "position_2"
         
         # Detect transition: position_1 -> position_2 -> position_1 = one rep
-        if self.current_state == "position_1" and new_state == "position_2":
-            # Moved from position 1 to position 2
-            self.current_state = "position_2"
-        elif self.current_state == "position_2" and new_state == "position_1":
-            # Completed a rep! (went from pos2 back to pos1)
+        rep_completed = self.current_state == "position_2" and new_state == "position_1"
+        self.current_state = new_state
+        if rep_completed:
             self.reps += 1
-            self.rep_times.append(time.time())
-            self.current_state = "position_1"
-            return True
-        
-        return False
+            if self._last_rep_time is not None:
+                self._interval_sum += now - self._last_rep_time
+                self._interval_count += 1
+            self._last_rep_time = now
+        return rep_completed
     
     def get_average_rep_time(self):
         """Calculate average time per rep"""
-        if len(self.rep_times) < 2:
+        if not self._interval_count:
             return 0
-        intervals = [self.rep_times[i] - self.rep_times[i-1] 
-                   for i in range(1, len(self.rep_times))]
-        return sum(intervals) / len(intervals) if intervals else 0
+        return self._interval_sum / self._interval_count
     
     def reset(self):
         """Reset tracker"""
         self.reps = 0
-        self.rep_times = []
+        self._last_rep_time = None
+        self._interval_sum = 0.0
+        self._interval_count = 0
         self.exercise_start_time = time.time()
         self.is_calibrated = False
         self.position_1 = None
         self.position_2 = None
         self.current_state = "position_1"
 
+# Key codes (both cases) for the controls
+KEY_ESC = 27
+KEYS_CALIBRATE = (ord('c'), ord('C'))
+KEYS_RESET = (ord('r'), ord('R'))
+KEYS_FULLSCREEN = (ord('f'), ord('F'))
+
+# Output frame size; the camera frame is scaled to fit and centered
+SCREEN_WIDTH = 1920
+SCREEN_HEIGHT = 1080
+
+# Run pose detection every N frames; reps are slow enough that the skipped
+# frames just reuse the previous landmarks
+INFERENCE_INTERVAL = 2
+
+# How long a "POSITION CAPTURED!" confirmation stays on screen (seconds)
+CONFIRM_DURATION = 1.0
+
+# Landmarks whose average Y is tracked for each exercise
+KEY_POINTS = {
+    "pushup": [Kp.LEFT_SHOULDER, Kp.RIGHT_SHOULDER],
+    "shoulder_raise": [Kp.LEFT_WRIST, Kp.RIGHT_WRIST],
+    "squat": [Kp.LEFT_HIP, Kp.RIGHT_HIP],
+}
+
 def get_key_point_y(landmarks_dict, exercise_type="pushup"):
     """Get the key point Y coordinate based on exercise type"""
-    if not landmarks_dict:
+    if not landmarks_dict or exercise_type not in KEY_POINTS:
         return None
-    
-    if exercise_type == "pushup":
-        # For push-ups, use average shoulder Y position
-        left_shoulder = landmarks_dict.get('left_shoulder')
-        right_shoulder = landmarks_dict.get('right_shoulder')
-        if left_shoulder and right_shoulder:
-            return (left_shoulder[1] + right_shoulder[1]) / 2
-    elif exercise_type == "shoulder_raise":
-        # For shoulder raises, use average wrist Y position
-        left_wrist = landmarks_dict.get('left_wrist')
-        right_wrist = landmarks_dict.get('right_wrist')
-        if left_wrist and right_wrist:
-            return (left_wrist[1] + right_wrist[1]) / 2
-    elif exercise_type == "squat":
-        # For squats, use average hip Y position
-        left_hip = landmarks_dict.get('left_hip')
-        right_hip = landmarks_dict.get('right_hip')
-        if left_hip and right_hip:
-            return (left_hip[1] + right_hip[1]) / 2
-    
-    return None
+    return float(landmarks_dict['px'][KEY_POINTS[exercise_type], 1].mean())
 
 def draw_countdown(frame, countdown_number, message=""):
     """Draw countdown on frame"""
     text = str(countdown_number) if countdown_number > 0 else "GO!"
-    text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 5, 10)[0]
+    text_size = get_text_size(text, FONT, 5, 10)[0]
     text_x = (frame.shape[1] - text_size[0]) // 2
     text_y = (frame.shape[0] + text_size[1]) // 2
     
     # Background
     cv2.rectangle(frame, (text_x - 50, text_y - text_size[1] - 50),
-                 (text_x + text_size[0] + 50, text_y + 50), (0, 0, 0), -1)
+                 (text_x + text_size[0] + 50, text_y + 50), BLACK, -1)
     
     # Countdown text
-    color = (0, 255, 0) if countdown_number == 0 else (0, 255, 255)
-    cv2.putText(frame, text, (text_x, text_y),
-               cv2.FONT_HERSHEY_SIMPLEX, 5, color, 10)
+    color = GREEN if countdown_number == 0 else YELLOW
+    put_cached_text(frame, text, (text_x, text_y),
+                   FONT, 5, color, 10)
     
     # Message
     if message:
-        msg_size = cv2.getTextSize(message, cv2.FONT_HERSHEY_SIMPLEX, 1.5, 3)[0]
+        msg_size = get_text_size(message, FONT, 1.5, 3)[0]
         msg_x = (frame.shape[1] - msg_size[0]) // 2
-        cv2.putText(frame, message, (msg_x, text_y - 100),
-                   cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+        put_cached_text(frame, message, (msg_x, text_y - 100),
+                       FONT, 1.5, WHITE, 3)
 
 def main():
-    tracker = PoseTracker()
+    tracker = PoseTracker(model_complexity=0, skip_static_frames=True)  # Only a key point's height is used
     
     if not tracker.start_camera():
         print("Error: Could not open camera")
@@ -150,80 +158,80 @@ def main():
     exercise_type = "pushup"  # Can be "pushup", "shoulder_raise", "squat"
     
     # Calibration state machine
-    calibration_state = "waiting"  # waiting, countdown_1, capture_1, countdown_2, capture_2, exercising
+    # waiting, countdown_1, capture_1, captured_1, countdown_2, capture_2, captured_2, exercising
+    calibration_state = "waiting"
     countdown_number = 3
     countdown_start_time = 0
     capture_duration = 1.0  # How long to capture position (1 second)
     capture_start_time = 0
     captured_positions = []
     
-    fullscreen = False
-    cv2.namedWindow('Full Body Exercise Tracker', cv2.WINDOW_NORMAL)
+    # Screen-sized output frame, reused every frame
+    canvas = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH, 3), dtype=np.uint8)
+    camera_size = None
+    frame_count = 0
+    results = None
+    
+    fullscreen = setup_fullscreen_window('Full Body Exercise Tracker', start_fullscreen=False)
     
     while True:
-        frame, results = tracker.get_frame()
+        if not is_window_visible('Full Body Exercise Tracker'):
+            # Window hidden: skip pose detection and drawing
+            if not idle_frame('Full Body Exercise Tracker'):
+                break
+            continue
+        
+        frame = tracker.get_raw_frame()
         if frame is None:
             break
         
-        # Get original frame dimensions
-        original_height, original_width = frame.shape[:2]
+        if frame.shape[:2] != camera_size:
+            # Fit the camera frame to the screen, centered (letterboxed);
+            # only recomputed when the camera frame size changes
+            camera_size = frame.shape[:2]
+            original_height, original_width = camera_size
+            scale = min(SCREEN_WIDTH / original_width, SCREEN_HEIGHT / original_height)
+            new_width = int(original_width * scale)
+            new_height = int(original_height * scale)
+            x_offset = (SCREEN_WIDTH - new_width) // 2
+            y_offset = (SCREEN_HEIGHT - new_height) // 2
+            camera_view = canvas[y_offset:y_offset+new_height, x_offset:x_offset+new_width]
+            # Bars around the camera view, cleared each frame to erase overlays
+            borders = [canvas[:y_offset], canvas[y_offset+new_height:],
+                       canvas[:, :x_offset], canvas[:, x_offset+new_width:]]
+            results = None  # Re-detect so landmarks match the new layout
         
-        # Get landmarks
-        landmarks_dict = tracker.get_landmarks(results, frame.shape)
-        
-        # Resize for fullscreen if enabled
-        screen_width = 1920
-        screen_height = 1080
-        scale = min(screen_width / original_width, screen_height / original_height)
-        new_width = int(original_width * scale)
-        new_height = int(original_height * scale)
-        frame = cv2.resize(frame, (new_width, new_height))
-        
-        # Scale landmarks
-        if landmarks_dict:
-            scale_x = new_width / original_width
-            scale_y = new_height / original_height
-            for key in landmarks_dict['landmarks']:
-                if landmarks_dict['landmarks'][key]:
-                    x, y = landmarks_dict['landmarks'][key]
-                    landmarks_dict['landmarks'][key] = (int(x * scale_x), int(y * scale_y))
-            for key in ['left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
-                        'left_wrist', 'right_wrist', 'left_hip', 'right_hip', 'left_knee',
-                        'right_knee', 'left_ankle', 'right_ankle', 'nose']:
-                if landmarks_dict.get(key):
-                    x, y = landmarks_dict[key]
-                    landmarks_dict[key] = (int(x * scale_x), int(y * scale_y))
-        
-        # Center frame if needed
-        if new_width < screen_width or new_height < screen_height:
-            black_frame = np.zeros((screen_height, screen_width, 3), dtype=np.uint8)
-            x_offset = (screen_width - new_width) // 2
-            y_offset = (screen_height - new_height) // 2
-            black_frame[y_offset:y_offset+new_height, x_offset:x_offset+new_width] = frame
-            frame = black_frame
+        frame_count += 1
+        if results is None or frame_count % INFERENCE_INTERVAL == 0:
+            results = tracker.process_frame(frame)
+            # Landmarks only change with new results; skipped frames reuse them.
+            # They are normalized, so map them straight onto the centered camera view
+            landmarks_dict = tracker.get_landmarks(results, camera_view.shape)
+            # Key point height as a fraction of the camera view, so the calibrated
+            # positions hold whatever size the view is displayed at
+            key_y = get_key_point_y(landmarks_dict, exercise_type)
+            if key_y is not None:
+                key_y /= new_height
             if landmarks_dict:
-                for key in landmarks_dict['landmarks']:
-                    if landmarks_dict['landmarks'][key]:
-                        x, y = landmarks_dict['landmarks'][key]
-                        landmarks_dict['landmarks'][key] = (x + x_offset, y + y_offset)
-                for key in ['left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
-                            'left_wrist', 'right_wrist', 'left_hip', 'right_hip', 'left_knee',
-                            'right_knee', 'left_ankle', 'right_ankle', 'nose']:
-                    if landmarks_dict.get(key):
-                        x, y = landmarks_dict[key]
-                        landmarks_dict[key] = (x + x_offset, y + y_offset)
+                landmarks_dict['px'] += (x_offset, y_offset)
+        
+        # Resize straight into the preallocated screen canvas
+        cv2.resize(frame, (new_width, new_height), dst=camera_view)
+        for border in borders:
+            border.fill(0)
+        frame = canvas
         
         current_time = time.time()
         
         # Draw pose if detected
         if landmarks_dict:
-            tracker.draw_pose(frame, landmarks_dict['pose_landmarks'])
+            tracker.draw_pose(frame, landmarks_dict)
         
         # Calibration state machine
         if calibration_state == "waiting":
-            cv2.putText(frame, "Press 'C' to start calibration", 
-                       (frame.shape[1] // 2 - 200, frame.shape[0] // 2),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+            put_cached_text(frame, "Press 'C' to start calibration", 
+                           (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2),
+                           FONT, 1.5, WHITE, 3)
             calibration_state = "ready"
         
         elif calibration_state == "countdown_1":
@@ -243,10 +251,8 @@ def main():
         
         elif calibration_state == "capture_1":
             # Capture position for 1 second
-            if landmarks_dict:
-                key_y = get_key_point_y(landmarks_dict, exercise_type)
-                if key_y is not None:
-                    captured_positions.append(key_y)
+            if key_y is not None:
+                captured_positions.append(key_y)
             
             elapsed = current_time - capture_start_time
             if elapsed >= capture_duration:
@@ -254,11 +260,19 @@ def main():
                 if captured_positions:
                     avg_y = sum(captured_positions) / len(captured_positions)
                     exercise_tracker.set_position_1(avg_y)
-                    cv2.putText(frame, "FIRST POSITION CAPTURED!", 
-                               (frame.shape[1] // 2 - 250, frame.shape[0] // 2),
-                               cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
-                    time.sleep(1)
-                
+                    # Confirm for a second while the camera keeps running
+                    calibration_state = "captured_1"
+                    capture_start_time = current_time
+                else:
+                    calibration_state = "countdown_2"
+                    countdown_start_time = current_time
+                    countdown_number = 3
+        
+        elif calibration_state == "captured_1":
+            put_cached_text(frame, "FIRST POSITION CAPTURED!", 
+                           (SCREEN_WIDTH // 2 - 250, SCREEN_HEIGHT // 2),
+                           FONT, 1.5, GREEN, 3)
+            if current_time - capture_start_time >= CONFIRM_DURATION:
                 calibration_state = "countdown_2"
                 countdown_start_time = current_time
                 countdown_number = 3
@@ -280,10 +294,8 @@ def main():
         
         elif calibration_state == "capture_2":
             # Capture position for 1 second
-            if landmarks_dict:
-                key_y = get_key_point_y(landmarks_dict, exercise_type)
-                if key_y is not None:
-                    captured_positions.append(key_y)
+            if key_y is not None:
+                captured_positions.append(key_y)
             
             elapsed = current_time - capture_start_time
             if elapsed >= capture_duration:
@@ -291,103 +303,100 @@ def main():
                 if captured_positions:
                     avg_y = sum(captured_positions) / len(captured_positions)
                     exercise_tracker.set_position_2(avg_y)
-                    cv2.putText(frame, "SECOND POSITION CAPTURED!", 
-                               (frame.shape[1] // 2 - 250, frame.shape[0] // 2),
-                               cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
-                    time.sleep(1)
-                
+                    # Confirm for a second while the camera keeps running
+                    calibration_state = "captured_2"
+                    capture_start_time = current_time
+                else:
+                    calibration_state = "exercising"
+                    exercise_tracker.exercise_start_time = current_time
+        
+        elif calibration_state == "captured_2":
+            put_cached_text(frame, "SECOND POSITION CAPTURED!", 
+                           (SCREEN_WIDTH // 2 - 250, SCREEN_HEIGHT // 2),
+                           FONT, 1.5, GREEN, 3)
+            if current_time - capture_start_time >= CONFIRM_DURATION:
                 calibration_state = "exercising"
                 exercise_tracker.exercise_start_time = current_time
         
         elif calibration_state == "exercising":
             # Track exercise reps
-            if landmarks_dict and exercise_tracker.is_calibrated:
-                key_y = get_key_point_y(landmarks_dict, exercise_type)
-                if key_y is not None:
-                    rep_detected = exercise_tracker.update(key_y)
-                    
-                    if rep_detected:
-                        cv2.putText(frame, "REP!", 
-                                   (frame.shape[1] // 2 - 100, 150),
-                                   cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 255, 0), 5)
+            if key_y is not None and exercise_tracker.is_calibrated:
+                rep_detected = exercise_tracker.update(key_y, current_time)
+                
+                if rep_detected:
+                    put_cached_text(frame, "REP!", 
+                                   (SCREEN_WIDTH // 2 - 100, 150),
+                                   FONT, 3, GREEN, 5)
             
             # Display stats
-            cv2.putText(frame, f'Reps: {exercise_tracker.reps}', (50, 50), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 3)
+            put_cached_text(frame, f'Reps: {exercise_tracker.reps}', (50, 50), 
+                           FONT, 2, GREEN, 3)
             
             elapsed_time = current_time - exercise_tracker.exercise_start_time
-            cv2.putText(frame, f'Time: {int(elapsed_time)}s', (50, 120), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 2)
+            put_cached_text(frame, f'Time: {int(elapsed_time)}s', (50, 120), 
+                           FONT, 1.5, WHITE, 2)
             
             if exercise_tracker.reps > 0:
                 avg_time = exercise_tracker.get_average_rep_time()
-                cv2.putText(frame, f'Avg: {avg_time:.1f}s/rep', (50, 170), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+                put_cached_text(frame, f'Avg: {avg_time:.1f}s/rep', (50, 170), 
+                               FONT, 1.2, WHITE, 2)
             
             # Show current position indicator
-            if landmarks_dict and exercise_tracker.is_calibrated:
-                key_y = get_key_point_y(landmarks_dict, exercise_type)
-                if key_y is not None:
-                    dist_to_pos1 = abs(key_y - exercise_tracker.position_1)
-                    dist_to_pos2 = abs(key_y - exercise_tracker.position_2)
-                    
-                    if dist_to_pos1 < dist_to_pos2:
-                        pos_text = "Position 1"
-                        pos_color = (0, 255, 255)
-                    else:
-                        pos_text = "Position 2"
-                        pos_color = (255, 0, 255)
-                    
-                    cv2.putText(frame, pos_text, (50, frame.shape[0] - 100),
-                               cv2.FONT_HERSHEY_SIMPLEX, 1.5, pos_color, 3)
+            if key_y is not None and exercise_tracker.is_calibrated:
+                # update() has just classified key_y against the calibrated positions
+                if exercise_tracker.current_state == "position_1":
+                    pos_text = "Position 1"
+                    pos_color = YELLOW
+                else:
+                    pos_text = "Position 2"
+                    pos_color = (255, 0, 255)
+                
+                put_cached_text(frame, pos_text, (50, SCREEN_HEIGHT - 100),
+                               FONT, 1.5, pos_color, 3)
             
             # Progress bar
             bar_width = 400
             bar_height = 40
             bar_x = 50
-            bar_y = frame.shape[0] - 150
+            bar_y = SCREEN_HEIGHT - 150
             
             cv2.rectangle(frame, (bar_x, bar_y), 
-                         (bar_x + bar_width, bar_y + bar_height), (100, 100, 100), -1)
+                         (bar_x + bar_width, bar_y + bar_height), GREY, -1)
             
             goal = 10
             progress = min((exercise_tracker.reps / goal) * 100, 100)
             progress_width = int(bar_width * (progress / 100))
             cv2.rectangle(frame, (bar_x, bar_y), 
-                         (bar_x + progress_width, bar_y + bar_height), (0, 255, 0), -1)
+                         (bar_x + progress_width, bar_y + bar_height), GREEN, -1)
             
-            cv2.putText(frame, f'Progress: {exercise_tracker.reps}/{goal} ({int(progress)}%)', 
-                       (bar_x, bar_y - 15), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+            put_cached_text(frame, f'Progress: {exercise_tracker.reps}/{goal} ({int(progress)}%)', 
+                           (bar_x, bar_y - 15), 
+                           FONT, 1, WHITE, 2)
         
         # Instructions
         if calibration_state == "exercising":
-            cv2.putText(frame, "Press 'C' to recalibrate | 'R' to reset | ESC to exit", 
-                       (50, frame.shape[0] - 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            put_cached_text(frame, "Press 'C' to recalibrate | 'R' to reset | ESC to exit", 
+                           (50, SCREEN_HEIGHT - 30), 
+                           FONT, 0.8, WHITE, 2)
         else:
-            cv2.putText(frame, "Press 'C' to calibrate | ESC to exit", 
-                       (50, frame.shape[0] - 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            put_cached_text(frame, "Press 'C' to calibrate | ESC to exit", 
+                           (50, SCREEN_HEIGHT - 30), 
+                           FONT, 0.8, WHITE, 2)
         
         cv2.imshow('Full Body Exercise Tracker', frame)
         
-        key = cv2.waitKey(1) & 0xFF
-        if key == 27:  # ESC
+        key = poll_key()
+        if key == KEY_ESC:
             break
-        elif key == ord('c') or key == ord('C'):  # Calibrate
+        elif key in KEYS_CALIBRATE:
             exercise_tracker.reset()
             calibration_state = "countdown_1"
             countdown_number = 3
             countdown_start_time = current_time
-        elif key == ord('r') or key == ord('R'):  # Reset
+        elif key in KEYS_RESET:
             exercise_tracker.reset()
-        elif key == ord('f') or key == ord('F'):  # Toggle fullscreen
-            fullscreen = not fullscreen
-            if fullscreen:
-                cv2.setWindowProperty('Full Body Exercise Tracker', cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-            else:
-                cv2.setWindowProperty('Full Body Exercise Tracker', cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
+        elif key in KEYS_FULLSCREEN:
+            fullscreen = toggle_fullscreen('Full Body Exercise Tracker', fullscreen)
     
     tracker.release()
     print("\nExercise session ended!")
@@ -4,8 +4,9 @@ Play virtual piano keys with finger taps
 """
 import cv2
 import numpy as np
-from base import HandTracker
-from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen
+from base import HandTracker, Lm
+from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen, is_window_visible, idle_frame, poll_key
+from overlay_helper import get_text_size, put_cached_text
 
 class PianoKey:
     def __init__(self, x, y, width, height, note, color, is_black=False):
@@ -15,19 +16,16 @@ class PianoKey:
         self.height = height
         self.note = note
         self.color = color
+        self.color_pressed = tuple(min(255, c + 50) for c in color)
         self.is_black = is_black
-        self.pressed = False
+        # The label never changes, so its position is fixed per key
+        if not is_black:
+            text_size = get_text_size(note, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
+            self.text_org = (x + (width - text_size[0]) // 2, y + height - 10)
     
-    def contains_point(self, point):
-        """Check if point is inside key"""
-        return (self.x <= point[0] <= self.x + self.width and
-                self.y <= point[1] <= self.y + self.height)
-    
-    def draw(self, frame):
+    def draw(self, frame, pressed=False):
         """Draw the piano key"""
-        color = (min(255, self.color[0] + 50), 
-                min(255, self.color[1] + 50), 
-                min(255, self.color[2] + 50)) if self.pressed else self.color
+        color = self.color_pressed if pressed else self.color
         
         cv2.rectangle(frame, (self.x, self.y), 
                      (self.x + self.width, self.y + self.height), 
@@ -36,12 +34,12 @@ class PianoKey:
                      (self.x + self.width, self.y + self.height), 
                      (255, 255, 255), 2)
         
-        # Draw note label
         if not self.is_black:
-            text_size = cv2.getTextSize(self.note, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
-            text_x = self.x + (self.width - text_size[0]) // 2
-            text_y = self.y + self.height - 10
-            cv2.putText(frame, self.note, (text_x, text_y), 
+            self.draw_label(frame)
+    
+    def draw_label(self, frame):
+        """Draw the note name near the bottom of the key"""
+        put_cached_text(frame, self.note, self.text_org, 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1)
 
 class AirPiano:
@@ -72,32 +70,56 @@ class AirPiano:
                 x = start_x + i * self.key_width + self.key_width - black_key_width // 2
                 self.keys.append(PianoKey(x, self.keyboard_y, black_key_width, 
                                         black_key_height, note, (0, 0, 0), is_black=True))
+        
+        # The white keys form one contiguous strip; fill, pressed color and
+        # borders are all white, so the whole strip is drawn as one rectangle
+        # with the gaps between keys as one batch of vertical lines
+        self.white_keys = [k for k in self.keys if not k.is_black]
+        self.white_strip = ((start_x, self.keyboard_y),
+                            (start_x + len(white_notes) * self.key_width,
+                             self.keyboard_y + self.key_height))
+        separator_x = start_x + self.key_width * np.arange(1, len(white_notes))
+        self.separators = np.stack([
+            np.stack([separator_x, np.full_like(separator_x, self.keyboard_y)], axis=1),
+            np.stack([separator_x, np.full_like(separator_x, self.keyboard_y + self.key_height)], axis=1),
+        ], axis=1).astype(np.int32)
+        
+        # Key rectangles as (x1, y1, x2, y2) rows for a vectorized hit test
+        self.bounds = np.array([(k.x, k.y, k.x + k.width, k.y + k.height) for k in self.keys])
+        self.pressed = np.zeros(len(self.keys), dtype=bool)
+        # Black keys sit on top of the white ones, so they win overlapping hits
+        self.top_first = np.argsort([not k.is_black for k in self.keys], kind='stable')
     
     def check_key_press(self, finger_tip):
         """Check if any key is being pressed"""
-        for key in self.keys:
-            was_pressed = key.pressed
-            key.pressed = key.contains_point(finger_tip)
-            
-            # If key just got pressed, play note
-            if key.pressed and not was_pressed:
-                return key.note
+        x, y = finger_tip
+        b = self.bounds
+        hit = (b[:, 0] <= x) & (x <= b[:, 2]) & (b[:, 1] <= y) & (y <= b[:, 3])
+        just_pressed = hit & ~self.pressed
+        self.pressed = hit
+        
+        # If a key just got pressed, play the topmost one's note
+        new_keys = self.top_first[just_pressed[self.top_first]]
+        if len(new_keys):
+            return self.keys[new_keys[0]].note
         return None
     
     def draw(self, frame):
         """Draw all piano keys"""
-        # Draw white keys first
-        for key in self.keys:
-            if not key.is_black:
-                key.draw(frame)
+        # Draw white keys first: the strip with its outline, then the labels
+        cv2.rectangle(frame, *self.white_strip, (255, 255, 255), -1)
+        cv2.rectangle(frame, *self.white_strip, (255, 255, 255), 2)
+        cv2.polylines(frame, self.separators, False, (0, 0, 0), 2)
+        for key in self.white_keys:
+            key.draw_label(frame)
         
         # Draw black keys on top
-        for key in self.keys:
+        for key, pressed in zip(self.keys, self.pressed):
             if key.is_black:
-                key.draw(frame)
+                key.draw(frame, pressed)
 
 def main():
-    tracker = HandTracker()
+    tracker = HandTracker(model_complexity=0, skip_static_frames=True)  # Only the index fingertip position is used
     
     if not tracker.start_camera():
         print("Error: Could not open camera")
@@ -113,13 +135,20 @@ def main():
     note_display_time = 0
     
     while True:
+        if not is_window_visible('Air Piano'):
+            # Window hidden: skip hand detection and drawing
+            if not idle_frame('Air Piano'):
+                break
+            continue
+        
         frame, results = tracker.get_frame()
         if frame is None:
             break
+        h, w = frame.shape[:2]
         
         # Initialize piano with frame dimensions
         if piano is None:
-            piano = AirPiano(frame.shape[1], frame.shape[0])
+            piano = AirPiano(w, h)
         
         landmarks_list = tracker.get_landmarks(results, frame.shape)
         
@@ -127,10 +156,10 @@ def main():
             landmarks = landmarks_list[0]
             
             # Draw hand skeleton
-            tracker.draw_hand_skeleton(frame, landmarks['hand_landmarks'])
+            tracker.draw_hand_skeleton(frame, landmarks)
             
             # Get index finger tip
-            index_tip = landmarks['index_tip']
+            index_tip = landmarks['px'][Lm.INDEX_TIP]
             
             # Check for key press
             note = piano.check_key_press(index_tip)
@@ -148,18 +177,18 @@ def main():
         
         # Display current note
         if note_display_time > 0:
-            cv2.putText(frame, f'Note: {last_note}', (50, 50), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 3)
+            put_cached_text(frame, f'Note: {last_note}', (50, 50), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 3)
             note_display_time -= 1
         
         # Instructions
-        cv2.putText(frame, 'Point index finger at keys to play', 
-                   (50, frame.shape[0] - 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        put_cached_text(frame, 'Point index finger at keys to play', 
+                       (50, h - 30), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
         cv2.imshow('Air Piano', frame)
         
-        key = cv2.waitKey(1) & 0xFF
+        key = poll_key()
         if key == 27:  # ESC
             break
         elif key == ord('f') or key == ord('F'):  # Toggle fullscreen
@@ -5,8 +5,31 @@ Analyzes hand posture and provides feedback
 import cv2
 import numpy as np
 import time
-from base import HandTracker
-from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen
+from base import HandTracker, Lm, FINGER_SLICES
+from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen, is_window_visible, idle_frame, poll_key
+from overlay_helper import put_cached_text
+
+# HUD colors (BGR) and font
+GREEN = (0, 255, 0)
+WHITE = (255, 255, 255)
+RED = (0, 0, 255)
+YELLOW = (0, 255, 255)
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# First three joints (MCP, PIP, DIP) of the index, middle, ring and pinky fingers
+_FINGER_JOINTS = np.array([np.arange(21)[FINGER_SLICES[name]][:3]
+                           for name in ('index', 'middle', 'ring', 'pinky')])
+
+def get_finger_angles(px):
+    """Bend angle in degrees at the PIP joint of each finger except the thumb"""
+    joints = px[_FINGER_JOINTS].astype(np.float64)
+    v1 = joints[:, 0] - joints[:, 1]
+    v2 = joints[:, 2] - joints[:, 1]
+    # Row-wise dot products and squared lengths, each in a single pass
+    dots = np.einsum('ij,ij->i', v1, v2)
+    lengths = np.sqrt(np.einsum('ij,ij->i', v1, v1) * np.einsum('ij,ij->i', v2, v2))
+    cos_angle = dots / (lengths + 1e-6)
+    return np.degrees(np.arccos(np.clip(cos_angle, -1, 1)))
 
 class PoseAnalyzer:
     def __init__(self):
@@ -20,54 +43,34 @@ class PoseAnalyzer:
         score = 100
         
         # Check finger extension (good posture = relaxed, not fully extended)
-        finger_angles = []
-        for finger_name in ['index', 'middle', 'ring', 'pinky']:
-            finger_points = landmarks['fingers'][finger_name]
-            if len(finger_points) >= 3:
-                p1 = np.array(finger_points[0])
-                p2 = np.array(finger_points[1])
-                p3 = np.array(finger_points[2])
-                
-                v1 = p1 - p2
-                v2 = p3 - p2
-                
-                try:
-                    cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2) + 1e-6)
-                    angle = np.degrees(np.arccos(np.clip(cos_angle, -1, 1)))
-                    finger_angles.append(angle)
-                except:
-                    pass
-        
-        if finger_angles:
-            avg_angle = np.mean(finger_angles)
-            # Good angle range: 120-160 degrees (relaxed)
-            if avg_angle < 100:
-                feedback.append("Fingers too curled - relax your hand")
-                score -= 20
-            elif avg_angle > 170:
-                feedback.append("Fingers too extended - relax your hand")
-                score -= 20
-            else:
-                feedback.append("Good finger position!")
+        avg_angle = get_finger_angles(landmarks['px']).mean()
+        # Good angle range: 120-160 degrees (relaxed)
+        if avg_angle < 100:
+            feedback.append("Fingers too curled - relax your hand")
+            score -= 20
+        elif avg_angle > 170:
+            feedback.append("Fingers too extended - relax your hand")
+            score -= 20
+        else:
+            feedback.append("Good finger position!")
         
         # Check wrist angle
-        wrist = landmarks['wrist']
-        middle_mcp = landmarks['landmarks'][9]
-        middle_pip = landmarks['landmarks'][10]
+        px = landmarks['px']
+        wrist = px[Lm.WRIST]
+        middle_mcp = px[Lm.MIDDLE_MCP]
+        middle_pip = px[Lm.MIDDLE_PIP]
         
-        wrist_angle = np.degrees(np.arctan2(
-            middle_pip[1] - middle_mcp[1],
-            middle_pip[0] - middle_mcp[0]
-        ))
+        dx, dy = middle_pip - middle_mcp
         
-        # Check for excessive wrist bend
-        if abs(wrist_angle) > 45:
+        # Check for excessive wrist bend: the MCP->PIP direction more than
+        # 45 degrees off pointing right, i.e. abs(atan2(dy, dx)) > 45
+        if abs(dy) > dx:
             feedback.append("Wrist bent too much - keep it straight")
             score -= 15
         
         # Check thumb position
-        thumb_tip = landmarks['thumb_tip']
-        index_mcp = landmarks['landmarks'][5]
+        thumb_tip = px[Lm.THUMB_TIP]
+        index_mcp = px[Lm.INDEX_MCP]
         thumb_distance = tracker.get_distance(thumb_tip, index_mcp)
         
         if thumb_distance > 100:
@@ -78,14 +81,14 @@ class PoseAnalyzer:
         if score >= 80:
             self.good_posture_count += 1
             status = "GOOD POSTURE"
-            status_color = (0, 255, 0)
+            status_color = GREEN
         elif score >= 60:
             status = "OK POSTURE"
-            status_color = (0, 255, 255)
+            status_color = YELLOW
         else:
             self.bad_posture_count += 1
             status = "POOR POSTURE"
-            status_color = (0, 0, 255)
+            status_color = RED
         
         return {
             'score': score,
@@ -95,7 +98,7 @@ class PoseAnalyzer:
         }
 
 def main():
-    tracker = HandTracker()
+    tracker = HandTracker(skip_static_frames=True, target_fps=30)
     analyzer = PoseAnalyzer()
     
     if not tracker.start_camera():
@@ -109,9 +112,16 @@ def main():
     fullscreen = setup_fullscreen_window('Hand Pose Analyzer', start_fullscreen=False)
     
     while True:
+        if not is_window_visible('Hand Pose Analyzer'):
+            # Window hidden: skip hand detection and drawing
+            if not idle_frame('Hand Pose Analyzer'):
+                break
+            continue
+        
         frame, results = tracker.get_frame()
         if frame is None:
             break
+        h, w = frame.shape[:2]
         
         landmarks_list = tracker.get_landmarks(results, frame.shape)
         
@@ -119,44 +129,44 @@ def main():
             landmarks = landmarks_list[0]
             
             # Draw hand skeleton
-            tracker.draw_hand_skeleton(frame, landmarks['hand_landmarks'])
+            tracker.draw_hand_skeleton(frame, landmarks)
             
             # Analyze posture
             analysis = analyzer.analyze_posture(landmarks, tracker)
             
             # Display score
             score = analysis['score']
-            cv2.putText(frame, f'Posture Score: {score}/100', (50, 50), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, analysis['status_color'], 3)
+            put_cached_text(frame, f'Posture Score: {score}/100', (50, 50), 
+                           FONT, 1.5, analysis['status_color'], 3)
             
             # Display status
-            cv2.putText(frame, analysis['status'], (50, 100), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.2, analysis['status_color'], 2)
+            put_cached_text(frame, analysis['status'], (50, 100), 
+                           FONT, 1.2, analysis['status_color'], 2)
             
             # Display feedback
             y_offset = 150
             for i, feedback_text in enumerate(analysis['feedback'][:3]):  # Show max 3 feedback items
-                color = (0, 255, 0) if "Good" in feedback_text else (0, 0, 255)
-                cv2.putText(frame, f'• {feedback_text}', (50, y_offset), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+                color = GREEN if "Good" in feedback_text else RED
+                put_cached_text(frame, f'• {feedback_text}', (50, y_offset), 
+                               FONT, 0.7, color, 2)
                 y_offset += 30
             
-            # Statistics
+            # Statistics (change every frame, so drawn directly rather than cached)
             total = analyzer.good_posture_count + analyzer.bad_posture_count
             if total > 0:
                 good_percent = (analyzer.good_posture_count / total) * 100
                 cv2.putText(frame, f'Good: {analyzer.good_posture_count} | Bad: {analyzer.bad_posture_count}', 
-                           (50, frame.shape[0] - 60), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                               (50, h - 60), 
+                               FONT, 0.7, WHITE, 2)
                 cv2.putText(frame, f'Good Posture Rate: {good_percent:.1f}%', 
-                           (50, frame.shape[0] - 30), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                               (50, h - 30), 
+                               FONT, 0.7, WHITE, 2)
             
             # Progress bar
             bar_width = 300
             bar_height = 20
             bar_x = 50
-            bar_y = frame.shape[0] - 100
+            bar_y = h - 100
             
             # Background
             cv2.rectangle(frame, (bar_x, bar_y), 
@@ -170,11 +180,11 @@ def main():
             
             # Border
             cv2.rectangle(frame, (bar_x, bar_y), 
-                         (bar_x + bar_width, bar_y + bar_height), (255, 255, 255), 2)
+                         (bar_x + bar_width, bar_y + bar_height), WHITE, 2)
         
         cv2.imshow('Hand Pose Analyzer', frame)
         
-        key = cv2.waitKey(1) & 0xFF
+        key = poll_key()
         if key == 27:  # ESC
             break
         elif key == ord('f') or key == ord('F'):  # Toggle fullscreen
@@ -4,8 +4,15 @@ Control volume with hand gestures (pinch to adjust)
 """
 import cv2
 import numpy as np
-from base import HandTracker
-from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen
+from base import HandTracker, Lm
+from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen, is_window_visible, idle_frame, poll_key
+from overlay_helper import put_cached_text
+
+# HUD colors (BGR) and font
+GREEN = (0, 255, 0)
+WHITE = (255, 255, 255)
+GREY = (100, 100, 100)
+FONT = cv2.FONT_HERSHEY_SIMPLEX
 
 class VolumeControl:
     def __init__(self):
@@ -29,41 +36,40 @@ class VolumeControl:
         self.last_pinch_dist = None
         self.is_controlling = False
 
+# Unit vectors of the volume arc's ticks, every 5 degrees starting at the top
+_ARC_ANGLES = np.deg2rad(np.arange(-90, 270, 5))
+_ARC_UNIT = np.stack([np.cos(_ARC_ANGLES), np.sin(_ARC_ANGLES)], axis=1)
+
 def draw_volume_bar(frame, volume, center):
     """Draw a circular volume indicator"""
     # Outer circle
-    cv2.circle(frame, center, 80, (100, 100, 100), 3)
+    cv2.circle(frame, center, 80, GREY, 3)
     
-    # Volume arc (green to red)
-    start_angle = -90
-    end_angle = start_angle + int(360 * (volume / 100))
+    # Volume arc: a radial tick every 5 degrees clockwise from the top,
+    # all drawn in one call
+    sweep = int(360 * (volume / 100))
+    ticks = _ARC_UNIT[:(sweep + 4) // 5]
+    segments = np.stack([center + 70 * ticks, center + 80 * ticks], axis=1).astype(np.int32)
     
-    # Draw volume arc
-    for angle in range(start_angle, end_angle, 5):
-        rad = np.deg2rad(angle)
-        x1 = int(center[0] + 70 * np.cos(rad))
-        y1 = int(center[1] + 70 * np.sin(rad))
-        x2 = int(center[0] + 80 * np.cos(rad))
-        y2 = int(center[1] + 80 * np.sin(rad))
-        
-        # Color gradient: green (0) to yellow (50) to red (100)
-        if volume < 50:
-            color = (0, int(255 * (volume / 50)), 255 - int(255 * (volume / 50)))
-        else:
-            color = (0, 255 - int(255 * ((volume - 50) / 50)), int(255 * ((volume - 50) / 50)))
-        
-        cv2.line(frame, (x1, y1), (x2, y2), color, 3)
+    # Color gradient: green (0) to yellow (50) to red (100)
+    if volume < 50:
+        color = (0, int(255 * (volume / 50)), 255 - int(255 * (volume / 50)))
+    else:
+        color = (0, 255 - int(255 * ((volume - 50) / 50)), int(255 * ((volume - 50) / 50)))
+    
+    if len(segments):
+        cv2.polylines(frame, segments, False, color, 3)
     
-    # Volume text
+    # Volume text (changes as the hand moves, so drawn directly rather than cached)
     cv2.putText(frame, f'{volume}%', (center[0] - 40, center[1] + 10), 
-               cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+                   FONT, 1, WHITE, 2)
     
     # Volume label
-    cv2.putText(frame, 'VOLUME', (center[0] - 50, center[1] - 100), 
-               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    put_cached_text(frame, 'VOLUME', (center[0] - 50, center[1] - 100), 
+                   FONT, 0.8, WHITE, 2)
 
 def main():
-    tracker = HandTracker()
+    tracker = HandTracker(model_complexity=0, skip_static_frames=True)  # Only the pinch and finger count are used
     volume_control = VolumeControl()
     
     if not tracker.start_camera():
@@ -78,6 +84,12 @@ def main():
     fullscreen = setup_fullscreen_window('Air Volume Control', start_fullscreen=False)
     
     while True:
+        if not is_window_visible('Air Volume Control'):
+            # Window hidden: skip hand detection and drawing
+            if not idle_frame('Air Volume Control'):
+                break
+            continue
+        
         frame, results = tracker.get_frame()
         if frame is None:
             break
@@ -88,11 +100,12 @@ def main():
             landmarks = landmarks_list[0]
             
             # Draw hand skeleton
-            tracker.draw_hand_skeleton(frame, landmarks['hand_landmarks'])
+            tracker.draw_hand_skeleton(frame, landmarks)
             
-            palm = landmarks['palm']
-            thumb_tip = landmarks['thumb_tip']
-            index_tip = landmarks['index_tip']
+            px = landmarks['px']
+            palm = px[Lm.PALM]
+            thumb_tip = px[Lm.THUMB_TIP]
+            index_tip = px[Lm.INDEX_TIP]
             
             # Calculate pinch distance
             pinch_dist = tracker.get_distance(thumb_tip, index_tip)
@@ -105,9 +118,9 @@ def main():
                 volume_control.update_volume(pinch_dist)
                 
                 # Draw connection line
-                cv2.line(frame, thumb_tip, index_tip, (0, 255, 0), 3)
-                cv2.circle(frame, thumb_tip, 10, (0, 255, 0), -1)
-                cv2.circle(frame, index_tip, 10, (0, 255, 0), -1)
+                cv2.line(frame, thumb_tip, index_tip, GREEN, 3)
+                cv2.circle(frame, thumb_tip, 10, GREEN, -1)
+                cv2.circle(frame, index_tip, 10, GREEN, -1)
             else:
                 volume_control.reset()
             
@@ -116,15 +129,15 @@ def main():
             
             # Status text
             if volume_control.is_controlling:
-                cv2.putText(frame, "CONTROLLING", (50, 50), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                put_cached_text(frame, "CONTROLLING", (50, 50), 
+                               FONT, 1, GREEN, 2)
             else:
-                cv2.putText(frame, "Pinch to control", (50, 50), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+                put_cached_text(frame, "Pinch to control", (50, 50), 
+                               FONT, 1, WHITE, 2)
         
         cv2.imshow('Air Volume Control', frame)
         
-        key = cv2.waitKey(1) & 0xFF
+        key = poll_key()
         if key == 27:  # ESC
             break
         elif key == ord('f') or key == ord('F'):  # Toggle fullscreen
@@ -1,13 +1,21 @@
 """
 Helper functions for fullscreen support across all features
 """
+import time
 import cv2
 import numpy as np
 
+_window_visibility = {}  # window name -> (last check time, visible)
+
 def setup_fullscreen_window(window_name, start_fullscreen=False):
     """Setup window with fullscreen capability"""
     try:
-        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+        try:
+            # OpenGL windows scale the frame on the GPU when resized/fullscreen
+            cv2.namedWindow(window_name, cv2.WINDOW_NORMAL | cv2.WINDOW_OPENGL)
+        except cv2.error:
+            # OpenCV built without OpenGL support
+            cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
         # Don't set fullscreen on startup - let user toggle it
         return False  # Always start in windowed mode
     except Exception as e:
@@ -38,3 +46,40 @@ def toggle_fullscreen(window_name, current_state):
     except:
         return False  # Return to windowed mode if anything fails
 
+def is_window_visible(window_name, check_interval=0.5):
+    """Check if the window is shown (queried at most every check_interval seconds)
+    
+    GTK, Qt and Win32 keep reporting a minimized window as visible, so there
+    this only turns False once the window has been closed.
+    """
+    now = time.time()
+    last_check, visible = _window_visibility.get(window_name, (0, True))
+    if now - last_check >= check_interval:
+        try:
+            visible = cv2.getWindowProperty(window_name, cv2.WND_PROP_VISIBLE) >= 1
+        except cv2.error:
+            visible = True  # Property not supported - assume visible
+        _window_visibility[window_name] = (now, visible)
+    return visible
+
+def poll_key():
+    """Read a pressed key (or 255) without waitKey(1)'s minimum 1 ms wait"""
+    if hasattr(cv2, 'pollKey'):  # OpenCV >= 4.5.2
+        return cv2.pollKey() & 0xFF
+    return cv2.waitKey(1) & 0xFF
+
+def idle_frame(window_name, delay_ms=100):
+    """Wait while the window is hidden (no hand detection, drawing or imshow)
+    
+    Pending key presses are left for the main loop. Returns False when the
+    window was closed, since showing a frame would only re-create it without
+    the flags from setup_fullscreen_window.
+    """
+    try:
+        closed = cv2.getWindowProperty(window_name, cv2.WND_PROP_AUTOSIZE) < 0
+    except cv2.error:
+        closed = True  # Backends raise for a window that no longer exists
+    if closed:
+        return False
+    time.sleep(delay_ms / 1000)
+    return True
@@ -3,10 +3,13 @@ Main AR UI Launcher
 Enhanced AR UI overlay with modular base system integration
 Author: Kabir Suri (codingkabs)
 """
+from functools import lru_cache
+import math
 import cv2
 import numpy as np
-from base import HandTracker
-from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen
+from base import HandTracker, Lm, FINGER_TIP_IDX
+from fullscreen_helper import setup_fullscreen_window, resize_frame_for_fullscreen, toggle_fullscreen, is_window_visible, idle_frame, poll_key
+from overlay_helper import get_text_size, put_cached_text
 
 # Enhanced color scheme (scary/horror theme with variations)
 DARK_RED = (0, 0, 139)      # Dark red/crimson
@@ -16,42 +19,82 @@ BRIGHT_RED = (0, 0, 200)    # Bright red
 DARK_PURPLE = (139, 0, 139) # Dark purple glow
 ACCENT = (0, 100, 255)      # Orange-red accent
 
-def draw_enhanced_glow_circle(img, center, radius, color, thickness=2, glow=15, pulse=0):
-    """Draw circle with enhanced glow and optional pulse effect"""
-    # Pulse effect
-    pulse_radius = int(radius * (1 + 0.1 * np.sin(pulse)))
+# Open-hand glow rings as (radius, color, thickness, glow)
+OPEN_HAND_RINGS = ((120, DARK_RED, 3, 30), (90, DARK_RED, 2, 20), (60, BLOOD_RED, 2, 10))
+
+@lru_cache(maxsize=None)
+def _glow_layers(glow):
+    """(ring offset, blend alpha) per glow layer, outermost first"""
+    return tuple((g, 0.08 + 0.12 * (g / glow)) for g in range(glow, 0, -3))
+
+def draw_glow_stack(img, center, rings, pulse=0):
+    """Draw glowing circles around one center, given as (radius, color, thickness, glow)
     
-    # Draw outer glow layers
-    for g in range(glow, 0, -3):
-        alpha = 0.08 + 0.12 * (g / glow)
-        overlay = img.copy()
-        cv2.circle(overlay, center, pulse_radius + g, color, thickness)
-        cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0, img)
+    The rings share one overlay buffer; each still blends only its own
+    bounding box, in the same order as separate draw_enhanced_glow_circle calls.
+    """
+    # Pulse effect
+    pulse_scale = 1 + 0.1 * np.sin(pulse)
+    rings = [(int(radius * pulse_scale), color, thickness, glow)
+             for radius, color, thickness, glow in rings]
+    max_reach = max(r + glow + thickness + 1 for r, _, thickness, glow in rings)
+    overlay_buf = np.empty((2 * max_reach + 1, 2 * max_reach + 1, 3), dtype=np.uint8)
     
-    # Draw main circle
-    cv2.circle(img, center, pulse_radius, color, thickness)
-    # Inner highlight
-    cv2.circle(img, center, int(pulse_radius * 0.7), color, 1)
+    for pulse_radius, color, thickness, glow in rings:
+        # Draw outer glow layers, blending only their bounding box instead of
+        # copying the whole frame per layer
+        reach = pulse_radius + glow + thickness + 1
+        x0, y0 = max(center[0] - reach, 0), max(center[1] - reach, 0)
+        x1, y1 = min(center[0] + reach + 1, img.shape[1]), min(center[1] + reach + 1, img.shape[0])
+        if x0 < x1 and y0 < y1:
+            roi = img[y0:y1, x0:x1]
+            overlay = overlay_buf[:y1 - y0, :x1 - x0]
+            roi_center = (center[0] - x0, center[1] - y0)
+            for g, alpha in _glow_layers(glow):
+                overlay[:] = roi
+                cv2.circle(overlay, roi_center, pulse_radius + g, color, thickness)
+                cv2.addWeighted(overlay, alpha, roi, 1 - alpha, 0, dst=roi)
+        
+        # Draw main circle
+        cv2.circle(img, center, pulse_radius, color, thickness)
+        # Inner highlight
+        cv2.circle(img, center, int(pulse_radius * 0.7), color, 1)
+
+def draw_enhanced_glow_circle(img, center, radius, color, thickness=2, glow=15, pulse=0):
+    """Draw circle with enhanced glow and optional pulse effect"""
+    draw_glow_stack(img, center, [(radius, color, thickness, glow)], pulse)
+
+@lru_cache(maxsize=None)
+def _tick_angles(num_ticks):
+    """Angles in degrees of num_ticks evenly spaced ticks starting at 0"""
+    return np.arange(num_ticks) * (360 / num_ticks)
 
 def draw_radial_ticks_enhanced(img, center, radius, color, num_ticks=24, length=22, thickness=3, rotation=0):
     """Draw radial ticks with rotation support"""
-    for i in range(num_ticks):
-        angle = np.deg2rad(i * (360/num_ticks) + rotation)
-        x1 = int(center[0] + (radius - length) * np.cos(angle))
-        y1 = int(center[1] + (radius - length) * np.sin(angle))
-        x2 = int(center[0] + radius * np.cos(angle))
-        y2 = int(center[1] + radius * np.sin(angle))
-        cv2.line(img, (x1, y1), (x2, y2), color, thickness)
-        # Add small dots at tick ends
+    # Directions of every tick from one vectorized cos/sin over the cached
+    # angle table instead of scalar trig per tick
+    angles = np.deg2rad(_tick_angles(num_ticks) + rotation)
+    direction = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    inner = (center + (radius - length) * direction).astype(np.int32)
+    outer = (center + radius * direction).astype(np.int32)
+    # All ticks in one call
+    cv2.polylines(img, np.stack([inner, outer], axis=1), False, color, thickness)
+    # Add small dots at tick ends
+    for x2, y2 in outer.tolist():
         cv2.circle(img, (x2, y2), 2, color, -1)
 
+# Sample angles of the animated core pattern and their directions
+_CORE_T = np.linspace(0, 2*np.pi, 40)
+_CORE_COS = np.cos(_CORE_T)
+_CORE_SIN = np.sin(_CORE_T)
+
 def draw_core_pattern_enhanced(img, center, radius, pulse=0):
     """Enhanced core pattern with animation"""
-    # Animated core pattern
-    for t in np.linspace(0, 2*np.pi, 40):
-        r = radius * (0.7 + 0.3 * np.sin(6*t + pulse))
-        x = int(center[0] + r * np.cos(t))
-        y = int(center[1] + r * np.sin(t))
+    # Animated core pattern: all 40 points in one vectorized pass
+    r = radius * (0.7 + 0.3 * np.sin(6*_CORE_T + pulse))
+    xs = (center[0] + r * _CORE_COS).astype(np.int32)
+    ys = (center[1] + r * _CORE_SIN).astype(np.int32)
+    for x, y in zip(xs.tolist(), ys.tolist()):
         cv2.circle(img, (x, y), 3, BLOOD_RED, -1)
     
     # Concentric circles with glow
@@ -59,22 +102,24 @@ def draw_core_pattern_enhanced(img, center, radius, pulse=0):
     cv2.circle(img, center, int(radius * 0.4), BLOOD_RED, 2)
     cv2.circle(img, center, int(radius * 0.2), DARK_PURPLE, 2)
 
+# Pixel offsets of the HUD bars (210-280 degrees) and blocks (270-315
+# degrees) from the palm; the angles never change, so the trig is done once
+# here. Flooring (with a little slack for values that should be whole) keeps
+# the shapes identical wherever the palm is.
+_HUD_BAR_ANGLES = np.deg2rad(210 + np.arange(8) * 10)
+_HUD_BAR_DIRS = np.stack([np.cos(_HUD_BAR_ANGLES), np.sin(_HUD_BAR_ANGLES)], axis=1)
+_HUD_BARS = np.floor(np.stack([140 * _HUD_BAR_DIRS, 170 * _HUD_BAR_DIRS], axis=1) + 1e-9).astype(np.int32)
+_HUD_BLOCK_ANGLES = np.deg2rad(270 + np.arange(4) * 15)
+_HUD_BLOCKS = np.floor(120 * np.stack([np.cos(_HUD_BLOCK_ANGLES), np.sin(_HUD_BLOCK_ANGLES)], axis=1)
+                       + 1e-9).astype(np.int32)
+
 def draw_hud_details_enhanced(img, center):
     """Enhanced HUD with more details"""
-    # Bottom HUD bars
-    for i in range(8):
-        angle = np.deg2rad(210 + i * 10)
-        x1 = int(center[0] + 140 * np.cos(angle))
-        y1 = int(center[1] + 140 * np.sin(angle))
-        x2 = int(center[0] + 170 * np.cos(angle))
-        y2 = int(center[1] + 170 * np.sin(angle))
-        cv2.line(img, (x1, y1), (x2, y2), DARK_RED, 4)
+    # Bottom HUD bars, all in one call
+    cv2.polylines(img, _HUD_BARS + center, False, DARK_RED, 4)
     
     # HUD blocks with glow
-    for i in range(4):
-        angle = np.deg2rad(270 + i * 15)
-        x = int(center[0] + 120 * np.cos(angle))
-        y = int(center[1] + 120 * np.sin(angle))
+    for x, y in (_HUD_BLOCKS + center).tolist():
         cv2.rectangle(img, (x - 10, y - 10), (x + 10, y + 10), DARK_RED, 2)
         cv2.circle(img, (x, y), 3, BLOOD_RED, -1)
 
@@ -85,26 +130,49 @@ def draw_arc_segments_enhanced(img, center):
     cv2.ellipse(img, center, (80, 80), 0, 0, 360, DARK_RED, 1)
     cv2.ellipse(img, center, (70, 70), 0, 0, 360, DARK_PURPLE, 1)
 
+def _render_static_hud():
+    """Pre-render the HUD details and arc segments around a sprite center"""
+    sprite = np.zeros((2 * _STATIC_HUD_HALF + 1, 2 * _STATIC_HUD_HALF + 1, 3), dtype=np.uint8)
+    center = np.array([_STATIC_HUD_HALF, _STATIC_HUD_HALF], dtype=np.int32)
+    draw_hud_details_enhanced(sprite, center)
+    draw_arc_segments_enhanced(sprite, tuple(center.tolist()))
+    # None of the HUD colors is black, so drawn pixels are the nonzero ones
+    return sprite, sprite.any(axis=2).astype(np.uint8)
+
+# The HUD details and arc segments have fixed geometry relative to the palm,
+# so they're rendered once and pasted through their mask each frame
+_STATIC_HUD_HALF = 176  # Covers the farthest HUD bar end plus its thickness
+_STATIC_HUD, _STATIC_HUD_MASK = _render_static_hud()
+
+def draw_static_hud(img, center):
+    """Paste the pre-rendered HUD details and arc segments centered on a point"""
+    x0, y0 = center[0] - _STATIC_HUD_HALF, center[1] - _STATIC_HUD_HALF
+    # Clip the sprite to the frame
+    sx0, sy0 = max(-x0, 0), max(-y0, 0)
+    sx1 = min(_STATIC_HUD.shape[1], img.shape[1] - x0)
+    sy1 = min(_STATIC_HUD.shape[0], img.shape[0] - y0)
+    if sx0 < sx1 and sy0 < sy1:
+        roi = img[y0 + sy0:y0 + sy1, x0 + sx0:x0 + sx1]
+        cv2.copyTo(_STATIC_HUD[sy0:sy1, sx0:sx1], _STATIC_HUD_MASK[sy0:sy1, sx0:sx1], roi)
+
 def draw_finger_connections_enhanced(frame, landmarks, palm):
     """Draw enhanced connections to fingertips"""
-    finger_tips = [
-        landmarks['thumb_tip'],
-        landmarks['index_tip'],
-        landmarks['middle_tip'],
-        landmarks['ring_tip'],
-        landmarks['pinky_tip']
-    ]
+    finger_tips = landmarks['px'][FINGER_TIP_IDX]
+    
+    # Glowing lines from the palm to every tip in one call
+    segments = np.empty((len(finger_tips), 2, 2), dtype=np.int32)
+    segments[:, 0] = palm
+    segments[:, 1] = finger_tips
+    cv2.polylines(frame, segments, False, DARK_RED, 2)
     
-    for tip in finger_tips:
-        # Glowing line to palm
-        cv2.line(frame, palm, tip, DARK_RED, 2)
+    for tip in finger_tips.tolist():
         # Glowing tip
         cv2.circle(frame, tip, 12, BLOOD_RED, -1)
         cv2.circle(frame, tip, 15, DARK_PURPLE, 2)
 
 def main():
     """Main AR UI application"""
-    tracker = HandTracker()
+    tracker = HandTracker(skip_static_frames=True, target_fps=30)  # Full model: shrink its input if it falls behind
     
     if not tracker.start_camera():
         print("Error: Could not open camera")
@@ -126,6 +194,12 @@ def main():
     fullscreen = setup_fullscreen_window('Hand Tracking AR UI - Enhanced', start_fullscreen=False)
     
     while True:
+        if not is_window_visible('Hand Tracking AR UI - Enhanced'):
+            # Window hidden: skip hand detection and drawing
+            if not idle_frame('Hand Tracking AR UI - Enhanced'):
+                break
+            continue
+        
         frame, results = tracker.get_frame()
         if frame is None:
             break
@@ -138,56 +212,46 @@ def main():
         
         if landmarks_list:
             landmarks = landmarks_list[0]
-            palm = landmarks['palm']
-            lm = landmarks['landmarks']
+            lm = landmarks['px']
+            # Plain ints, so the per-frame layout arithmetic below stays
+            # out of NumPy scalar math
+            palm = tuple(lm[Lm.PALM].tolist())
             
             # Draw hand skeleton
-            tracker.draw_hand_skeleton(frame, landmarks['hand_landmarks'])
+            tracker.draw_hand_skeleton(frame, landmarks)
             
             # Calculate gesture metrics
-            tips = [
-                landmarks['thumb_tip'], landmarks['index_tip'],
-                landmarks['middle_tip'], landmarks['ring_tip'],
-                landmarks['pinky_tip']
-            ]
-            dists = [tracker.get_distance(tip, palm) for tip in tips]
-            avg_dist = np.mean(dists)
+            tips = lm[FINGER_TIP_IDX]
+            avg_dist = tracker.get_distances_to(tips, palm).mean()
             
             # Pinch detection
-            pinch_dist = tracker.get_distance(landmarks['thumb_tip'], landmarks['index_tip'])
+            pinch_dist = tracker.get_distance(lm[Lm.THUMB_TIP], lm[Lm.INDEX_TIP])
             pinch_val = int(100 - min(pinch_dist, 100))
             
             # Gesture-based UI rendering
             if avg_dist > 70:
                 # Open hand: Full enhanced AR UI
-                draw_enhanced_glow_circle(frame, palm, 120, DARK_RED, 3, glow=30, pulse=pulse)
-                draw_enhanced_glow_circle(frame, palm, 90, DARK_RED, 2, glow=20, pulse=pulse)
-                draw_enhanced_glow_circle(frame, palm, 60, BLOOD_RED, 2, glow=10, pulse=pulse)
+                draw_glow_stack(frame, palm, OPEN_HAND_RINGS, pulse=pulse)
                 
                 draw_radial_ticks_enhanced(frame, palm, 120, DARK_RED, num_ticks=24, 
                                           length=22, thickness=3, rotation=rotation)
                 draw_core_pattern_enhanced(frame, palm, 35, pulse=pulse)
-                draw_hud_details_enhanced(frame, palm)
-                draw_arc_segments_enhanced(frame, palm)
+                draw_static_hud(frame, palm)
                 
                 # Enhanced finger connections
                 draw_finger_connections_enhanced(frame, landmarks, palm)
                 
                 # Calculate and display angle
-                v1 = np.array(landmarks['thumb_tip']) - np.array(palm)
-                v2 = np.array(landmarks['index_tip']) - np.array(palm)
-                try:
-                    angle = int(np.degrees(np.arccos(
-                        np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2) + 1e-6)
-                    )))
-                except:
-                    angle = 0
+                # Angle between palm->thumb and palm->index from their cross
+                # and dot products (atan2 needs no normalizing or domain guard)
+                (x1, y1), (x2, y2) = (lm[[Lm.THUMB_TIP, Lm.INDEX_TIP]] - palm).tolist()
+                angle = int(math.degrees(abs(math.atan2(x1 * y2 - y1 * x2, x1 * x2 + y1 * y2))))
                 
-                # Enhanced text display
+                # Enhanced text display (per-frame values are drawn directly, not cached)
                 cv2.putText(frame, f'{angle}°', (palm[0] + 40, palm[1] - 40),
-                           cv2.FONT_HERSHEY_DUPLEX, 1.5, (0, 0, 0), 4)
+                               cv2.FONT_HERSHEY_DUPLEX, 1.5, (0, 0, 0), 4)
                 cv2.putText(frame, f'{angle}°', (palm[0] + 40, palm[1] - 40),
-                           cv2.FONT_HERSHEY_DUPLEX, 1.5, BLOOD_RED, 2)
+                               cv2.FONT_HERSHEY_DUPLEX, 1.5, BLOOD_RED, 2)
                 
             elif pinch_val < 60:
                 # Pinch gesture: Enhanced visualization
@@ -195,7 +259,7 @@ def main():
                 
                 # Enhanced text with background
                 text = f'Pinch: {pinch_val}'
-                text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1, 3)[0]
+                text_size = get_text_size(text, cv2.FONT_HERSHEY_SIMPLEX, 1, 3)[0]
                 text_x = palm[0] - 40
                 text_y = palm[1] - 70
                 
@@ -203,7 +267,7 @@ def main():
                 cv2.rectangle(frame, (text_x - 5, text_y - text_size[1] - 5),
                              (text_x + text_size[0] + 5, text_y + 5), (0, 0, 0), -1)
                 cv2.putText(frame, text, (text_x, text_y),
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, BLOOD_RED, 3)
+                               cv2.FONT_HERSHEY_SIMPLEX, 1, BLOOD_RED, 3)
                 
                 # Animated arcs
                 for i in range(5):
@@ -216,23 +280,23 @@ def main():
                 
                 # Enhanced text
                 text = 'FIST'
-                text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1, 3)[0]
+                text_size = get_text_size(text, cv2.FONT_HERSHEY_SIMPLEX, 1, 3)[0]
                 text_x = palm[0] - 30
                 text_y = palm[1] - 70
                 
                 cv2.rectangle(frame, (text_x - 5, text_y - text_size[1] - 5),
                              (text_x + text_size[0] + 5, text_y + 5), (0, 0, 0), -1)
-                cv2.putText(frame, text, (text_x, text_y),
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, BLOOD_RED, 3)
+                put_cached_text(frame, text, (text_x, text_y),
+                               cv2.FONT_HERSHEY_SIMPLEX, 1, BLOOD_RED, 3)
         
         # Display info overlay
         info_text = "Hand Tracking AR UI - Press ESC to exit"
-        cv2.putText(frame, info_text, (10, frame.shape[0] - 10),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        put_cached_text(frame, info_text, (10, frame.shape[0] - 10),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
         
         cv2.imshow('Hand Tracking AR UI - Enhanced', frame)
         
-        key = cv2.waitKey(1) & 0xFF
+        key = poll_key()
         if key == 27:  # ESC
             break
         elif key == ord('f') or key == ord('F'):  # Toggle fullscreen
@@ -0,0 +1,72 @@
+"""
+Helper functions for pre-rendered text overlays shared by all features
+"""
+from functools import lru_cache
+import cv2
+import numpy as np
+
+class TextOverlay:
+    """Text rasterized once into an image + mask and pasted onto frames"""
+
+    def __init__(self, width, height):
+        self.image = np.zeros((height, width, 3), dtype=np.uint8)
+        self.mask = np.zeros((height, width), dtype=np.uint8)
+        self.anchor = (0, 0)  # Position inside the overlay that maps to apply()'s origin
+        self._blend = None  # (premultiplied image, inverse alpha) for anti-aliased text
+
+    def put_text(self, text, org, font, scale, color, thickness=1):
+        """Rasterize text into the overlay (same arguments as cv2.putText)"""
+        cv2.putText(self.image, text, org, font, scale, color, thickness)
+        cv2.putText(self.mask, text, org, font, scale, 255, thickness)
+        self._blend = None
+
+    def _get_blend(self):
+        """Alpha terms for builds whose putText anti-aliases (None if hard-edged)"""
+        if self._blend is None:
+            if np.isin(self.mask, (0, 255)).all():
+                self._blend = False
+            else:
+                # Text drawn on black is already premultiplied by its coverage,
+                # so only the background needs scaling by 1 - alpha (uint8 terms
+                # keep the paste in saturating cv2 ops instead of float math)
+                self._blend = (self.image, cv2.merge([255 - self.mask] * 3))
+        return self._blend
+
+    def apply(self, frame, origin=(0, 0)):
+        """Copy the rendered text pixels onto the frame at origin"""
+        x = origin[0] - self.anchor[0]
+        y = origin[1] - self.anchor[1]
+        h, w = self.mask.shape
+        # Clip against the frame borders
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+        roi = frame[y0:y1, x0:x1]
+        src = np.s_[y0 - y:y1 - y, x0 - x:x1 - x]
+        blend = self._get_blend()
+        if blend:
+            premultiplied, inverse_alpha = blend
+            cv2.multiply(roi, inverse_alpha[src], dst=roi, scale=1 / 255)
+            cv2.add(roi, premultiplied[src], dst=roi)
+        else:
+            cv2.copyTo(self.image[src], self.mask[src], roi)
+
+@lru_cache(maxsize=256)
+def get_text_overlay(text, font, scale, color, thickness=1):
+    """Pre-rendered overlay for a single text string (cached by its arguments)"""
+    (text_w, text_h), baseline = cv2.getTextSize(text, font, scale, thickness)
+    pad = thickness + 2
+    overlay = TextOverlay(text_w + 2 * pad, text_h + baseline + 2 * pad)
+    overlay.anchor = (pad, text_h + pad)
+    overlay.put_text(text, overlay.anchor, font, scale, color, thickness)
+    return overlay
+
+@lru_cache(maxsize=256)
+def get_text_size(text, font, scale, thickness=1):
+    """Cached cv2.getTextSize"""
+    return cv2.getTextSize(text, font, scale, thickness)
+
+def put_cached_text(frame, text, org, font, scale, color, thickness=1):
+    """Drop-in replacement for cv2.putText that reuses pre-rendered text"""
+    get_text_overlay(text, font, scale, tuple(color), thickness).apply(frame, org)
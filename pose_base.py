@@ -1,138 +1,181 @@
+import math
 import cv2
 import mediapipe as mp
 import numpy as np
+from base import CameraStream, StaticFrameGate
+
+class Kp:
+    """MediaPipe Pose landmark indices into the (33, 2) 'px' array"""
+    NOSE = 0
+    LEFT_SHOULDER = 11
+    RIGHT_SHOULDER = 12
+    LEFT_ELBOW = 13
+    RIGHT_ELBOW = 14
+    LEFT_WRIST = 15
+    RIGHT_WRIST = 16
+    LEFT_HIP = 23
+    RIGHT_HIP = 24
+    LEFT_KNEE = 25
+    RIGHT_KNEE = 26
+    LEFT_ANKLE = 27
+    RIGHT_ANKLE = 28
+
+# Skeleton bones as (start, end) landmark index pairs
+POSE_CONNECTIONS = np.array(sorted(mp.solutions.pose.POSE_CONNECTIONS), dtype=np.intp)
+# Joints as zero-length segments (round line caps turn those into filled
+# dots), grouped by mp_drawing's default pose colors: nose, left, right side
+POSE_JOINT_COLORS = [
+    (np.array([0]), (224, 224, 224)),
+    (np.array([1, 2, 3, 7, 9, 11, 13, 15, 17, 19, 21, 23, 25, 27, 29, 31]), (0, 138, 255)),
+    (np.array([4, 5, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 26, 28, 30, 32]), (231, 217, 0)),
+]
+# MediaPipe's drawing threshold for a landmark being in view
+VISIBILITY_THRESHOLD = 0.5
+
+# Arms and legs as joint chains (shoulder-elbow-wrist, hip-knee-ankle)
+LIMB_CHAINS = np.array([
+    [Kp.LEFT_SHOULDER, Kp.LEFT_ELBOW, Kp.LEFT_WRIST],
+    [Kp.RIGHT_SHOULDER, Kp.RIGHT_ELBOW, Kp.RIGHT_WRIST],
+    [Kp.LEFT_HIP, Kp.LEFT_KNEE, Kp.LEFT_ANKLE],
+    [Kp.RIGHT_HIP, Kp.RIGHT_KNEE, Kp.RIGHT_ANKLE],
+])
 
 class PoseTracker:
     """Base class for full body pose tracking functionality"""
     
-    def __init__(self):
+    def __init__(self, model_complexity=1, inference_scale=0.5, skip_static_frames=False):
         # Initialize MediaPipe Pose
+        # model_complexity=0 selects the lite pose landmark model.
+        # inference_scale shrinks the frame fed to MediaPipe; landmarks come
+        # back normalized so they still map onto any display size.
+        # skip_static_frames reuses the previous results while the camera
+        # image stays practically unchanged (see base.StaticFrameGate).
         self.mp_pose = mp.solutions.pose
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
         self.pose = self.mp_pose.Pose(
             static_image_mode=False,
-            model_complexity=1,
+            model_complexity=model_complexity,
             smooth_landmarks=True,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
-        self.cap = None
+        self.inference_scale = inference_scale
+        self.camera = CameraStream()
+        self._static_gate = StaticFrameGate() if skip_static_frames else None
+        self._last_results = None
+        # Reused per-frame buffers (allocated on first frame / size change)
+        self._inference_shape = None
+        self._small_buf = None
+        self._rgb_buf = None
     
     def start_camera(self, camera_index=0):
-        """Start the webcam"""
-        self.cap = cv2.VideoCapture(camera_index)
-        return self.cap.isOpened()
+        """Start the webcam and its background capture thread"""
+        return self.camera.start(camera_index)
     
     def get_frame(self):
-        """Get a frame from the camera"""
-        if self.cap is None:
+        """Get a frame from the camera (the frame buffer is reused on the next call)"""
+        frame = self.get_raw_frame()
+        if frame is None:
             return None, None
-        ret, frame = self.cap.read()
-        if ret:
-            frame = cv2.flip(frame, 1)  # Mirror the frame
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.pose.process(rgb)
-            return frame, results
-        return None, None
+        return frame, self.process_frame(frame)
+    
+    def get_raw_frame(self):
+        """Get the latest mirrored camera frame without running pose detection"""
+        return self.camera.read()
+    
+    def process_frame(self, frame):
+        """Run pose detection on a downscaled copy of a BGR frame"""
+        if self._rgb_buf is None or self._inference_shape != frame.shape:
+            self._allocate_inference_buffers(frame.shape)
+            if self._static_gate is not None:
+                self._static_gate.reset()
+        # Unchanged frame: skip the resize, color conversion and inference
+        if self._static_gate is not None and self._static_gate.is_static(frame):
+            return self._last_results
+        small = frame
+        if self._small_buf is not None:
+            cv2.resize(frame, self._small_buf.shape[1::-1],
+                       dst=self._small_buf, interpolation=cv2.INTER_AREA)
+            small = self._small_buf
+        self._rgb_buf.flags.writeable = True
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        # Read-only input lets MediaPipe wrap the buffer without a defensive copy
+        self._rgb_buf.flags.writeable = False
+        self._last_results = self.pose.process(self._rgb_buf)
+        return self._last_results
+    
+    def _allocate_inference_buffers(self, frame_shape):
+        """Allocate the downscale and RGB buffers for a frame size"""
+        h, w = frame_shape[:2]
+        self._inference_shape = frame_shape
+        self._small_buf = None
+        if self.inference_scale != 1.0:
+            small_shape = (int(h * self.inference_scale), int(w * self.inference_scale), 3)
+            self._small_buf = np.empty(small_shape, dtype=np.uint8)
+        self._rgb_buf = np.empty(self._small_buf.shape if self._small_buf is not None
+                                 else frame_shape, dtype=np.uint8)
     
     def get_landmarks(self, results, frame_shape):
-        """Extract pose landmarks as pixel coordinates"""
+        """Extract pose landmarks as a (33, 2) float32 array of pixel coordinates"""
         if not results.pose_landmarks:
             return None
         
         h, w, _ = frame_shape
-        landmarks = {}
-        
         # Convert normalized landmarks to pixel coordinates
-        for idx, landmark in enumerate(results.pose_landmarks.landmark):
-            landmarks[idx] = (int(landmark.x * w), int(landmark.y * h))
-        
-        # Key body points (MediaPipe Pose landmark indices)
+        landmark = results.pose_landmarks.landmark
+        coords = np.fromiter(
+            (c for l in landmark for c in (l.x, l.y, l.visibility)),
+            dtype=np.float32, count=3 * len(landmark)
+        ).reshape(-1, 3)
         return {
-            'landmarks': landmarks,
+            'px': coords[:, :2] * (w, h),  # Index with Kp, e.g. px[Kp.LEFT_SHOULDER]
+            'visible': coords[:, 2] >= VISIBILITY_THRESHOLD,
             'pose_landmarks': results.pose_landmarks,
-            # Face
-            'nose': landmarks.get(0),
-            # Shoulders
-            'left_shoulder': landmarks.get(11),
-            'right_shoulder': landmarks.get(12),
-            # Elbows
-            'left_elbow': landmarks.get(13),
-            'right_elbow': landmarks.get(14),
-            # Wrists
-            'left_wrist': landmarks.get(15),
-            'right_wrist': landmarks.get(16),
-            # Hips
-            'left_hip': landmarks.get(23),
-            'right_hip': landmarks.get(24),
-            # Knees
-            'left_knee': landmarks.get(25),
-            'right_knee': landmarks.get(26),
-            # Ankles
-            'left_ankle': landmarks.get(27),
-            'right_ankle': landmarks.get(28),
         }
     
-    def draw_pose(self, frame, pose_landmarks):
-        """Draw the full body pose skeleton"""
-        self.mp_drawing.draw_landmarks(
-            frame,
-            pose_landmarks,
-            self.mp_pose.POSE_CONNECTIONS,
-            landmark_drawing_spec=self.mp_drawing_styles.get_default_pose_landmarks_style()
-        )
+    def draw_pose(self, frame, landmarks_dict):
+        """Draw the full body pose skeleton (mp_drawing's default look)"""
+        px = landmarks_dict['px'].astype(np.int32)
+        visible = landmarks_dict['visible']
+        # Every bone between two visible joints in one call
+        bones = POSE_CONNECTIONS[visible[POSE_CONNECTIONS].all(axis=1)]
+        if len(bones):
+            cv2.polylines(frame, px[bones], False, (224, 224, 224), 2)
+        # Joints: colored dots with a white rim
+        for joints, color in POSE_JOINT_COLORS:
+            joints = joints[visible[joints]]
+            if len(joints):
+                dots = px[np.repeat(joints, 2).reshape(-1, 2)]
+                cv2.polylines(frame, dots, False, (224, 224, 224), 9)
+                cv2.polylines(frame, dots, False, color, 5)
     
     def draw_body_outline(self, frame, landmarks_dict):
         """Draw a simple body outline"""
         if not landmarks_dict:
             return
         
-        landmarks = landmarks_dict['landmarks']
+        px = landmarks_dict['px'].astype(np.int32)
         
-        # Draw body outline using key points
         # Head circle
-        if landmarks.get(0):  # Nose
-            nose = landmarks[0]
-            cv2.circle(frame, nose, 30, (0, 255, 0), 2)
-        
-        # Torso (shoulders to hips)
-        if landmarks.get(11) and landmarks.get(12) and landmarks.get(23) and landmarks.get(24):
-            left_shoulder = landmarks[11]
-            right_shoulder = landmarks[12]
-            left_hip = landmarks[23]
-            right_hip = landmarks[24]
-            
-            # Draw torso rectangle
-            top_left = (min(left_shoulder[0], right_shoulder[0]), min(left_shoulder[1], right_shoulder[1]))
-            bottom_right = (max(left_hip[0], right_hip[0]), max(left_hip[1], right_hip[1]))
-            cv2.rectangle(frame, top_left, bottom_right, (0, 255, 0), 2)
+        cv2.circle(frame, tuple(px[Kp.NOSE]), 30, (0, 255, 0), 2)
         
-        # Arms
-        if landmarks.get(11) and landmarks.get(13) and landmarks.get(15):
-            cv2.line(frame, landmarks[11], landmarks[13], (0, 255, 0), 2)
-            cv2.line(frame, landmarks[13], landmarks[15], (0, 255, 0), 2)
-        if landmarks.get(12) and landmarks.get(14) and landmarks.get(16):
-            cv2.line(frame, landmarks[12], landmarks[14], (0, 255, 0), 2)
-            cv2.line(frame, landmarks[14], landmarks[16], (0, 255, 0), 2)
+        # Torso rectangle (shoulders to hips)
+        shoulders = px[[Kp.LEFT_SHOULDER, Kp.RIGHT_SHOULDER]]
+        hips = px[[Kp.LEFT_HIP, Kp.RIGHT_HIP]]
+        cv2.rectangle(frame, tuple(shoulders.min(axis=0)), tuple(hips.max(axis=0)), (0, 255, 0), 2)
         
-        # Legs
-        if landmarks.get(23) and landmarks.get(25) and landmarks.get(27):
-            cv2.line(frame, landmarks[23], landmarks[25], (0, 255, 0), 2)
-            cv2.line(frame, landmarks[25], landmarks[27], (0, 255, 0), 2)
-        if landmarks.get(24) and landmarks.get(26) and landmarks.get(28):
-            cv2.line(frame, landmarks[24], landmarks[26], (0, 255, 0), 2)
-            cv2.line(frame, landmarks[26], landmarks[28], (0, 255, 0), 2)
+        # Arms and legs
+        cv2.polylines(frame, px[LIMB_CHAINS], False, (0, 255, 0), 2)
     
     def get_distance(self, point1, point2):
         """Calculate distance between two points"""
         if point1 is None or point2 is None:
             return 0
-        return np.linalg.norm(np.array(point1) - np.array(point2))
+        return math.hypot(point1[0] - point2[0], point1[1] - point2[1])
     
     def release(self):
         """Release the camera"""
-        if self.cap:
-            self.cap.release()
+        self.camera.release()
         cv2.destroyAllWindows()
 